@@ -1,8 +1,12 @@
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTextEdit, QWidget, QLineEdit, 
-                             QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFrame,QSizePolicy, QScrollArea)
-from PyQt5.QtGui import QIcon, QColor, QTextCursor, QFont, QPixmap, QPainter, QPainterPath, QMovie
-from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QRect, QEasingCurve, QTime, QPoint
+                             QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFrame,QSizePolicy, QScrollArea,
+                             QListView, QStyledItemDelegate, QAbstractItemView)
+from PyQt5.QtGui import (QIcon, QColor, QTextCursor, QFont, QPixmap, QPainter, QPainterPath, QMovie,
+                         QFontMetrics, QLinearGradient, QBrush)
+from PyQt5.QtCore import (Qt, QTimer, QPropertyAnimation, QRect, QRectF, QEasingCurve, QTime, QPoint, QObject,
+                          pyqtSignal, QAbstractListModel, QModelIndex, QSize)
 from dotenv import dotenv_values
+from collections import deque
 import sys
 import os
 
@@ -29,11 +33,21 @@ os.makedirs(TempDirPath, exist_ok=True)
 os.makedirs(DataDirPath, exist_ok=True)
 
 # Global variables
-old_chat_message = ""
-current_display_text = ""
-target_text = ""
-char_index = 0
-chat_history = []
+chat_offset = 0  # bytes of Responses.data already read
+
+# Chat view: only a window of the transcript is kept in memory
+CHAT_PAGE_SIZE = 50       # messages read from disk per scroll page
+CHAT_MAX_RESIDENT = 300   # messages held by the chat model at most
+TRANSCRIPT_CHUNK = 64 * 1024
+
+# In-process message bus from main.py; None when running detached (file protocol)
+gui_bus = None
+
+# Topic names, mirrored from backend/message_bus.py so a detached GUI needs no backend import
+BUS_MIC = "mic"
+BUS_QUERY = "query"
+BUS_STATUS = "status"
+BUS_CHAT = "chat"
 
 def AnswerModifier(Answer):
     lines = Answer.split('\n')
@@ -60,10 +74,15 @@ def QueryModifier(Query):
     return new_query.capitalize()
 
 def SetMicrophoneStatus(Command):
+    if gui_bus:
+        gui_bus.publish(BUS_MIC, Command)
+        return
     with open(TempDirectoryPath('Mic.data'), 'w', encoding='utf-8') as file:
         file.write(Command)
 
 def GetMicrophoneStatus():
+    if gui_bus:
+        return gui_bus.latest(BUS_MIC, "False")
     try:
         with open(TempDirectoryPath('Mic.data'), 'r', encoding='utf-8') as file:
             Status = file.read().strip()
@@ -72,10 +91,15 @@ def GetMicrophoneStatus():
         return "False"
 
 def SetAsssistantStatus(Status):
+    if gui_bus:
+        gui_bus.publish(BUS_STATUS, Status)
+        return
     with open(rf'{TempDirPath}\Status.data', 'w', encoding='utf-8') as file:
         file.write(Status)
 
 def GetAssistantStatus():
+    if gui_bus:
+        return gui_bus.latest(BUS_STATUS)
     try:
         with open(rf'{TempDirPath}\Status.data', 'r', encoding='utf-8') as file:
             Status = file.read()
@@ -117,6 +141,250 @@ def InitializeFiles():
                 else:
                     f.write('')
 
+class ChatMessage:
+    """One transcript line and where it sits in Responses.data"""
+    __slots__ = ("is_user", "text", "start", "end", "shown")
+
+    def __init__(self, is_user, text, start, end, shown=None):
+        self.is_user = is_user
+        self.text = text
+        self.start = start
+        self.end = end
+        self.shown = shown  # characters typed out so far; None once complete
+
+def ParseChatLine(line, start, end):
+    """ChatMessage for a 'User: ...' / 'OmnisAI: ...' transcript line, else None"""
+    if line.startswith(f"{Username}:"):
+        return ChatMessage(True, line[len(Username) + 1:].strip(), start, end)
+    for prefix in (f"{Assistantname}:", "OmnisAI:"):
+        if line.startswith(prefix):
+            return ChatMessage(False, line[len(prefix):].strip(), start, end)
+    return None
+
+def TranscriptEnd():
+    """Byte offset just past the last complete line of Responses.data"""
+    try:
+        with open(TempDirectoryPath('Responses.data'), 'rb') as file:
+            end = file.seek(0, os.SEEK_END)
+            # Step back a chunk at a time; a line can be longer than one chunk
+            while end > 0:
+                pos = max(end - TRANSCRIPT_CHUNK, 0)
+                file.seek(pos)
+                cut = file.read(end - pos).rfind(b'\n')
+                if cut != -1:
+                    return pos + cut + 1
+                end = pos
+            return 0
+    except OSError:
+        return 0
+
+def ReadTranscriptBefore(offset, count):
+    """Up to `count` chat messages ending at byte `offset`, oldest first"""
+    messages = []
+    try:
+        with open(TempDirectoryPath('Responses.data'), 'rb') as file:
+            pos = offset   # file offset of buffer[0]
+            buffer = b''
+            end = 0        # buffer[:end] is not parsed yet
+            while len(messages) < count:
+                # Newline that ends the line before the last unparsed one
+                cut = buffer.rfind(b'\n', 0, max(end - 1, 0))
+                if cut == -1 and pos > 0:
+                    read = min(TRANSCRIPT_CHUNK, pos)
+                    pos -= read
+                    file.seek(pos)
+                    buffer = file.read(read) + buffer[:end]
+                    end = len(buffer)
+                    continue
+                if end == 0:
+                    break
+                message = ParseChatLine(buffer[cut + 1:end].decode('utf-8', errors='replace').strip(),
+                                        pos + cut + 1, pos + end)
+                if message:
+                    messages.append(message)
+                end = cut + 1
+    except FileNotFoundError:
+        pass
+    messages.reverse()
+    return messages
+
+def ReadTranscriptAfter(offset, limit, count=None):
+    """Chat messages between byte `offset` and `limit`; returns (messages, offset read up to)"""
+    messages = []
+    try:
+        with open(TempDirectoryPath('Responses.data'), 'rb') as file:
+            file.seek(offset)
+            while offset < limit and (count is None or len(messages) < count):
+                raw = file.readline()
+                if not raw.endswith(b'\n'):
+                    break  # half-written line; read it next time
+                message = ParseChatLine(raw.decode('utf-8', errors='replace').strip(),
+                                        offset, offset + len(raw))
+                offset += len(raw)
+                if message:
+                    messages.append(message)
+    except FileNotFoundError:
+        pass
+    return messages, offset
+
+class ChatListModel(QAbstractListModel):
+    """Resident window of the transcript, oldest first"""
+    MessageRole = Qt.UserRole + 1
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.messages)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        message = self.messages[index.row()]
+        if role == Qt.DisplayRole:
+            return message.text if message.shown is None else message.text[:message.shown]
+        if role == self.MessageRole:
+            return message
+        return None
+
+    def firstOffset(self, default):
+        return self.messages[0].start if self.messages else default
+
+    def lastOffset(self, default):
+        return self.messages[-1].end if self.messages else default
+
+    def reset(self, messages):
+        self.beginResetModel()
+        self.messages = list(messages)
+        self.endResetModel()
+
+    def prepend(self, messages):
+        if messages:
+            self.beginInsertRows(QModelIndex(), 0, len(messages) - 1)
+            self.messages[:0] = messages
+            self.endInsertRows()
+
+    def append(self, messages):
+        if messages:
+            first = len(self.messages)
+            self.beginInsertRows(QModelIndex(), first, first + len(messages) - 1)
+            self.messages.extend(messages)
+            self.endInsertRows()
+
+    def trimFront(self, count):
+        if count > 0:
+            self.beginRemoveRows(QModelIndex(), 0, count - 1)
+            del self.messages[:count]
+            self.endRemoveRows()
+
+    def trimBack(self, count):
+        if count > 0:
+            first = len(self.messages) - count
+            self.beginRemoveRows(QModelIndex(), first, len(self.messages) - 1)
+            del self.messages[first:]
+            self.endRemoveRows()
+
+    def rowOf(self, message):
+        # Live messages are at the end, so search backwards
+        for row in range(len(self.messages) - 1, -1, -1):
+            if self.messages[row] is message:
+                return row
+        return -1
+
+    def messageChanged(self, row):
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+class ChatBubbleDelegate(QStyledItemDelegate):
+    """Paints one chat bubble; sized for the full text so typing never re-lays out the list"""
+    MARGIN_X = 12
+    MARGIN_Y = 6
+    PAD_X = 16
+    PAD_Y = 12
+    RADIUS = 16
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.text_font = QFont("Segoe UI")
+        self.text_font.setPixelSize(13)
+        self.label_font = QFont("Segoe UI")
+        self.label_font.setPixelSize(10)
+        self.label_font.setBold(True)
+        self.text_metrics = QFontMetrics(self.text_font)
+        self.label_metrics = QFontMetrics(self.label_font)
+
+    def bubbleLayout(self, message, width):
+        """(bubble size, text size) for a message in a view `width` pixels wide"""
+        max_text_width = max(int(width * 0.75) - 2 * self.PAD_X, 40)
+        text_size = self.text_metrics.boundingRect(
+            QRect(0, 0, max_text_width, 100000), Qt.TextWordWrap, message.text).size()
+        label_height = self.label_metrics.height() + 4
+        bubble_width = max(text_size.width(), self.label_metrics.horizontalAdvance("User") + 16) + 2 * self.PAD_X
+        bubble_height = self.PAD_Y + label_height + text_size.height() + self.PAD_Y
+        return QSize(bubble_width, bubble_height), text_size
+
+    def sizeHint(self, option, index):
+        message = index.data(ChatListModel.MessageRole)
+        width = self.parent().viewport().width()
+        bubble_size, _ = self.bubbleLayout(message, width)
+        return QSize(width, bubble_size.height() + 2 * self.MARGIN_Y)
+
+    def paint(self, painter, option, index):
+        message = index.data(ChatListModel.MessageRole)
+        rect = option.rect
+        bubble_size, text_size = self.bubbleLayout(message, rect.width())
+        if message.is_user:
+            left = rect.left() + self.MARGIN_X
+            colors = ("#1e3c72", "#2a5298")
+        else:
+            left = rect.right() - self.MARGIN_X - bubble_size.width()
+            colors = ("#2a3f5f", "#3a5278")
+        bubble = QRect(left, rect.top() + self.MARGIN_Y, bubble_size.width(), bubble_size.height())
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        gradient = QLinearGradient(bubble.topLeft(), bubble.bottomRight())
+        gradient.setColorAt(0, QColor(colors[0]))
+        gradient.setColorAt(1, QColor(colors[1]))
+        path = QPainterPath()
+        path.addRoundedRect(QRectF(bubble), self.RADIUS, self.RADIUS)
+        painter.fillPath(path, QBrush(gradient))
+
+        # Sender label: plain "User", or an "AI" pill
+        painter.setFont(self.label_font)
+        label_rect = QRect(bubble.left() + self.PAD_X, bubble.top() + self.PAD_Y,
+                           bubble.width() - 2 * self.PAD_X, self.label_metrics.height())
+        if message.is_user:
+            painter.setPen(QColor("#b3d4fc"))
+            painter.drawText(label_rect, Qt.AlignLeft | Qt.AlignVCenter, "User")
+        else:
+            pill = QRect(label_rect.left(), label_rect.top(), self.label_metrics.horizontalAdvance("AI") + 16,
+                         label_rect.height())
+            pill_path = QPainterPath()
+            pill_path.addRoundedRect(QRectF(pill), pill.height() / 2, pill.height() / 2)
+            painter.fillPath(pill_path, QColor("#4a7c9e"))
+            painter.setPen(Qt.white)
+            painter.drawText(pill, Qt.AlignCenter, "AI")
+
+        painter.setFont(self.text_font)
+        painter.setPen(Qt.white)
+        text_rect = QRect(bubble.left() + self.PAD_X, label_rect.bottom() + 5,
+                          text_size.width(), text_size.height())
+        painter.drawText(text_rect, Qt.TextWordWrap, index.data(Qt.DisplayRole))
+        painter.restore()
+
+class BusBridge(QObject):
+    """Re-emits bus messages as Qt signals so widgets update on the GUI thread"""
+    chatMessage = pyqtSignal(str)
+    statusChanged = pyqtSignal(str)
+
+    def __init__(self, bus):
+        super().__init__()
+        bus.subscribe(BUS_CHAT, self.chatMessage.emit)
+        bus.subscribe(BUS_STATUS, self.statusChanged.emit)
+
 class AnimatedGIF(QLabel):
     """Widget to display animated GIFs"""
     def __init__(self, gif_path):
@@ -171,16 +439,24 @@ class CompactChatWidget(QWidget):
         self.is_fullscreen = False
         self.mic_enabled = False
         
-        self.loadChatHistory()
-        
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.loadMessages)
-        self.update_timer.timeout.connect(self.checkQueryFile)
-        self.update_timer.start(100)
-        
+        # Messages still being typed out, oldest first
+        self.typing_queue = deque()
         self.typewriter_timer = QTimer(self)
         self.typewriter_timer.timeout.connect(self.typewriterEffect)
         
+        self.loadChatHistory()
+        
+        if gui_bus:
+            # Pushed by main.py; a chat message means new lines in the transcript
+            self.bus_bridge = BusBridge(gui_bus)
+            self.bus_bridge.chatMessage.connect(self.readNewMessages)
+            self.bus_bridge.statusChanged.connect(self.showStatus)
+        else:
+            # Detached GUI: fall back to polling the *.data files
+            self.update_timer = QTimer(self)
+            self.update_timer.timeout.connect(self.loadMessages)
+            self.update_timer.start(100)
+        
     def initUI(self):
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
@@ -201,10 +477,19 @@ class CompactChatWidget(QWidget):
         title_bar = self.createTitleBar()
         container_layout.addWidget(title_bar)
         
-        self.chat_display = QTextEdit()
-        self.chat_display.setReadOnly(True)
+        # Model/view chat list: only visible bubbles are painted
+        self.chat_model = ChatListModel()
+        self.chat_display = QListView()
+        self.chat_display.setModel(self.chat_model)
+        self.chat_display.setItemDelegate(ChatBubbleDelegate(self.chat_display))
+        self.chat_display.setSelectionMode(QAbstractItemView.NoSelection)
+        self.chat_display.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.chat_display.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.chat_display.setResizeMode(QListView.Adjust)
+        self.chat_display.setFocusPolicy(Qt.NoFocus)
+        self.chat_display.verticalScrollBar().valueChanged.connect(self.onChatScrolled)
         self.chat_display.setStyleSheet("""
-            QTextEdit {
+            QListView {
                 background-color: #1e2235;
                 color: white;
                 border: none;
@@ -672,123 +957,113 @@ class CompactChatWidget(QWidget):
             self.text_input.clear()
         
         if message:
-            with open(TempDirectoryPath('Query.data'), 'w', encoding='utf-8') as f:
-                f.write(message)
-    
-    def checkQueryFile(self):
-        """Check if there's a query from text input to process"""
-        try:
-            with open(TempDirectoryPath('Query.data'), 'r', encoding='utf-8') as f:
-                query = f.read().strip()
-            
-            if query:
+            if gui_bus:
+                gui_bus.publish(BUS_QUERY, message)
+            else:
+                # main.py reads and clears Query.data; the GUI only writes it
                 with open(TempDirectoryPath('Query.data'), 'w', encoding='utf-8') as f:
-                    f.write('')
-        except:
-            pass
+                    f.write(message)
     
     def loadChatHistory(self):
-        """Load existing chat history on startup"""
-        global chat_history, old_chat_message
-        try:
-            with open(rf'{TempDirPath}\Responses.data', 'r', encoding='utf-8') as file:
-                messages = file.read()
-            
-            if messages:
-                chat_history = messages.split('\n')
-                old_chat_message = messages
-                self.displayChatHistory(messages)
-        except FileNotFoundError:
-            pass
+        """Show the last page of the transcript"""
+        global chat_offset
+        chat_offset = TranscriptEnd()
+        self.typing_queue.clear()
+        self.chat_model.reset(ReadTranscriptBefore(chat_offset, CHAT_PAGE_SIZE))
+        self.chat_display.scrollToBottom()
     
-    def displayChatHistory(self, messages):
-        """Display chat history without typewriter effect"""
-        self.chat_display.clear()
-        html_content = self.formatMessages(messages)
-        self.chat_display.setHtml(html_content)
-        
-        cursor = self.chat_display.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        self.chat_display.setTextCursor(cursor)
+    def atTranscriptEnd(self):
+        return self.chat_model.lastOffset(chat_offset) >= chat_offset
     
-    def formatMessages(self, text):
-        """Format messages as HTML bubbles"""
-        lines = text.split('\n')
-        html_content = ""
-        
-        for line in lines:
-            if line.strip():
-                if line.startswith(f"{Username}:"):
-                    content = line.replace(f"{Username}:", "").strip()
-                    html_content += f"""
-                        <div style='margin: 10px 0; text-align: left;'>
-                            <div style='background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%); 
-                                        color: white; padding: 12px 16px; border-radius: 18px 18px 18px 4px; 
-                                        display: inline-block; max-width: 75%; box-shadow: 0 2px 8px rgba(0,0,0,0.3);'>
-                                <span style='font-size: 10px; color: #b3d4fc; font-weight: 600;'>User</span><br>
-                                <span style='font-size: 13px;'>{content}</span>
-                            </div>
-                        </div>
-                    """
-                elif line.startswith(f"{Assistantname}:") or line.startswith("OmnisAI:"):
-                    content = line.replace(f"{Assistantname}:", "").replace("OmnisAI:", "").strip()
-                    html_content += f"""
-                        <div style='margin: 10px 0; text-align: right;'>
-                            <div style='background: linear-gradient(135deg, #2a3f5f 0%, #3a5278 100%); 
-                                        color: white; padding: 12px 16px; border-radius: 18px 18px 4px 18px; 
-                                        display: inline-block; max-width: 75%; box-shadow: 0 2px 8px rgba(0,0,0,0.3);'>
-                                <div style='display: flex; align-items: center; margin-bottom: 4px;'>
-                                    <span style='background-color: #4a7c9e; color: white; font-size: 9px; 
-                                                padding: 2px 8px; border-radius: 10px; font-weight: 600;'>AI</span>
-                                </div>
-                                <span style='font-size: 13px;'>{content}</span>
-                            </div>
-                        </div>
-                    """
-        
-        return html_content
+    def onChatScrolled(self, value):
+        scrollbar = self.chat_display.verticalScrollBar()
+        if value == scrollbar.minimum():
+            self.loadOlderMessages()
+        elif value == scrollbar.maximum() and not self.atTranscriptEnd():
+            self.loadNewerMessages()
     
-    def loadMessages(self):
-        global old_chat_message, target_text, char_index
+    def loadOlderMessages(self):
+        """Page older messages in from disk above the current first row"""
+        first = self.chat_model.firstOffset(chat_offset)
+        if first <= 0:
+            return
+        older = ReadTranscriptBefore(first, CHAT_PAGE_SIZE)
+        if not older:
+            return
+        self.chat_model.prepend(older)
+        self.chat_model.trimBack(self.chat_model.rowCount() - CHAT_MAX_RESIDENT)
+        # Keep the row that was on top where it was
+        self.chat_display.scrollTo(self.chat_model.index(len(older)), QAbstractItemView.PositionAtTop)
+    
+    def loadNewerMessages(self):
+        """Page newer messages back in below the current last row"""
+        newer, _ = ReadTranscriptAfter(self.chat_model.lastOffset(chat_offset), chat_offset, CHAT_PAGE_SIZE)
+        if not newer:
+            return
+        anchor = self.chat_model.rowCount() - 1
+        self.chat_model.append(newer)
+        excess = self.chat_model.rowCount() - CHAT_MAX_RESIDENT
+        self.chat_model.trimFront(excess)
+        self.chat_display.scrollTo(self.chat_model.index(anchor - max(excess, 0)), QAbstractItemView.PositionAtBottom)
+    
+    def readNewMessages(self, *_):
+        """Tail Responses.data: read only the bytes appended since the last read"""
+        global chat_offset
         try:
-            with open(rf'{TempDirPath}\Responses.data', 'r', encoding='utf-8') as file:
-                messages = file.read()
-            
-            if messages and messages != old_chat_message:
-                if len(messages) > len(old_chat_message):
-                    target_text = messages
-                    char_index = len(old_chat_message)
-                    self.typewriter_timer.start(20)
-                    old_chat_message = messages
-                elif messages != old_chat_message:
-                    old_chat_message = messages
-                    self.displayChatHistory(messages)
-            
-            status = GetAssistantStatus()
-            if status:
-                self.status_label.setText(f"{status}")
-                if hasattr(self, 'fullscreen_status'):
-                    self.fullscreen_status.setText(f"Status: {status}")
-        except FileNotFoundError:
-            pass
+            size = os.path.getsize(TempDirectoryPath('Responses.data'))
+        except OSError:
+            return
+        
+        if size < chat_offset:
+            # Transcript was cleared or replaced; start over
+            self.loadChatHistory()
+            return
+        if size == chat_offset:
+            return
+        
+        # Jump back to the latest messages if the user was reading history
+        if not self.atTranscriptEnd():
+            self.typing_queue.clear()
+            self.chat_model.reset(ReadTranscriptBefore(chat_offset, CHAT_PAGE_SIZE))
+        
+        new_messages, chat_offset = ReadTranscriptAfter(chat_offset, size)
+        for message in new_messages:
+            message.shown = 0
+            self.typing_queue.append(message)
+        self.chat_model.append(new_messages)
+        self.chat_model.trimFront(self.chat_model.rowCount() - CHAT_MAX_RESIDENT)
+        self.chat_display.scrollToBottom()
+        
+        if self.typing_queue and not self.typewriter_timer.isActive():
+            self.typewriter_timer.start(20)
+    
+    def loadMessages(self):
+        """File-protocol poll: new transcript lines and the status"""
+        self.readNewMessages()
+        self.showStatus(GetAssistantStatus())
+    
+    def showStatus(self, status):
+        if status:
+            self.status_label.setText(f"{status}")
+            if hasattr(self, 'fullscreen_status'):
+                self.fullscreen_status.setText(f"Status: {status}")
     
     def typewriterEffect(self):
-        global char_index, target_text
-        
-        if char_index < len(target_text):
-            self.chat_display.clear()
-            
-            current_text = target_text[:char_index + 1]
-            html_content = self.formatMessages(current_text)
-            self.chat_display.setHtml(html_content)
-            
-            cursor = self.chat_display.textCursor()
-            cursor.movePosition(QTextCursor.End)
-            self.chat_display.setTextCursor(cursor)
-            
-            char_index += 1
-        else:
-            self.typewriter_timer.stop()
+        """Reveal one more character of the live message; only its row repaints"""
+        while self.typing_queue:
+            message = self.typing_queue[0]
+            row = self.chat_model.rowOf(message)
+            if row == -1 or message.shown >= len(message.text):
+                # Finished, or paged out of the model
+                message.shown = None
+                self.typing_queue.popleft()
+                if row != -1:
+                    self.chat_model.messageChanged(row)
+                continue
+            message.shown += 1
+            self.chat_model.messageChanged(row)
+            return
+        self.typewriter_timer.stop()
     
     def minimizeWidget(self):
         self.showMinimized()
@@ -852,7 +1127,9 @@ class CompactChatWidget(QWidget):
             self.move(event.globalPos() - self.drag_position)
             event.accept()
 
-def GraphicalUserInterface():
+def GraphicalUserInterface(bus=None):
+    global gui_bus
+    gui_bus = bus
     InitializeFiles()
     app = QApplication(sys.argv)
     window = CompactChatWidget()
@@ -0,0 +1,141 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+# Clip formats the TTS engines produce, as file extensions
+AUDIO_FORMATS = ("mp3", "wav")
+
+
+def audio_format(data: bytes) -> str:
+    """Format of a clip: local engines produce wav, edge_tts mp3"""
+    return "wav" if data[:4] == b"RIFF" else "mp3"
+
+
+class AudioCache:
+    """Content-addressed audio clip cache on disk with size-bounded LRU eviction.
+
+    Each clip is stored as <sha256>.mp3 or <sha256>.wav, whichever it is,
+    where the hash covers the text and every synthesis setting (voice, pitch,
+    rate), so changing the voice never serves stale audio. Recency is the
+    file's mtime, refreshed on every hit, so LRU order survives restarts.
+    Least recently used clips are deleted once the directory grows past
+    `max_bytes`.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 100 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+
+        self._entries = OrderedDict()   # key -> (size, format), least recently used first
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def key(text: str, voice: str, pitch: str, rate: str) -> str:
+        return hashlib.sha256("\x1f".join((voice, pitch, rate, text.strip())).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.directory, f"{key}.{fmt}")
+
+    def _scan(self):
+        files = []
+        for name in os.listdir(self.directory):
+            key, _, fmt = name.rpartition(".")
+            if fmt in AUDIO_FORMATS:
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, key, stat.st_size, fmt))
+            elif name.endswith(".tmp"):
+                # Left behind by a crash mid-write
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+        with self._lock:
+            for _, key, size, fmt in sorted(files):
+                self._total -= self._entries.pop(key, (0, fmt))[0]
+                self._entries[key] = (size, fmt)
+                self._total += size
+            self._evict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            path = self._path(key, self._entries[key][1])
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._total -= self._entries.pop(key, (0, None))[0]
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key: str, data: bytes):
+        if not data:
+            return
+        fmt = audio_format(data)
+        path = self._path(key, fmt)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[warning] Failed to cache audio {path}: {e}")
+            return
+        with self._lock:
+            size, old_fmt = self._entries.pop(key, (0, fmt))
+            self._total -= size
+            self._entries[key] = (len(data), fmt)
+            self._total += len(data)
+            self._evict()
+        if old_fmt != fmt:
+            try:
+                os.remove(self._path(key, old_fmt))
+            except OSError:
+                pass
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, (size, fmt) = self._entries.popitem(last=False)
+            self._total -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(key, fmt))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "clips": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
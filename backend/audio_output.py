@@ -0,0 +1,457 @@
+import io
+import queue
+import threading
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+import pygame
+
+try:
+    from .audio_cache import audio_format
+except ImportError:
+    from audio_cache import audio_format
+
+# edge_tts produces 24 kHz mono mp3; opening the device at that rate avoids resampling
+MIXER_FREQUENCY = 24000
+MIXER_CHANNELS = 1
+MIXER_BUFFER = 1024
+
+# Streamed clips are decoded in segments: a small first one so sound starts
+# early, then doubling so there are few segment joins in a long answer
+STREAM_FIRST_SEGMENT = 3 * 1024
+STREAM_MAX_SEGMENT = 64 * 1024
+# Frames repeated at the start of each later segment and trimmed after
+# decoding, so the bit reservoir of its first real frame is available
+STREAM_OVERLAP_FRAMES = 4
+
+# Layer III bitrates (kbps) by MPEG version, and sample rates by version bits
+MP3_BITRATES = {
+    "1": [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    "2": [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def mp3_frame_info(header: bytes) -> Optional[Tuple[int, int, int]]:
+    """(frame length, sample rate, samples per frame) of an MPEG Layer III header, or None"""
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    version = (header[1] >> 3) & 3        # 3: MPEG-1, 2: MPEG-2, 0: MPEG-2.5
+    layer = (header[1] >> 1) & 3          # 1: Layer III
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 3
+    padding = (header[2] >> 1) & 1
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+    if version == 3:
+        bitrate = MP3_BITRATES["1"][bitrate_index] * 1000
+        return 144 * bitrate // sample_rate + padding, sample_rate, 1152
+    bitrate = MP3_BITRATES["2"][bitrate_index] * 1000
+    return 72 * bitrate // sample_rate + padding, sample_rate, 576
+
+
+class Mp3FrameSplitter:
+    """Cuts an mp3 byte stream into whole frames as chunks arrive"""
+
+    def __init__(self):
+        self._buffer = b""
+        self._skipped_tag = False
+        self.sample_rate = None
+        self.samples_per_frame = None
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        self._buffer += chunk
+        if not self._skipped_tag:
+            if len(self._buffer) < 10:
+                return []
+            if self._buffer.startswith(b"ID3"):
+                size = 10 + sum((self._buffer[6 + i] & 0x7F) << (7 * (3 - i)) for i in range(4))
+                if len(self._buffer) < size:
+                    return []
+                self._buffer = self._buffer[size:]
+            self._skipped_tag = True
+
+        frames = []
+        position = 0
+        while position + 4 <= len(self._buffer):
+            info = mp3_frame_info(self._buffer[position:position + 4])
+            if info is None:
+                # Lost sync: look for the next frame header
+                position = self._buffer.find(b"\xff", position + 1)
+                if position < 0:
+                    position = len(self._buffer)
+                continue
+            length, self.sample_rate, self.samples_per_frame = info
+            if position + length > len(self._buffer):
+                break
+            frames.append(self._buffer[position:position + length])
+            position += length
+        self._buffer = self._buffer[position:]
+        return frames
+
+
+class AudioStream:
+    """mp3 bytes arriving from a synthesizer; the player reads them as they come.
+
+    A wav clip (from a local engine standing in for a failed online one) is
+    put as a single chunk and played whole.
+    """
+    _END = object()
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self.error = None
+
+    def put(self, chunk: bytes):
+        if chunk:
+            self._queue.put(chunk)
+
+    def close(self, error: Exception = None):
+        self.error = error
+        self._queue.put(self._END)
+
+    def read(self, timeout: float) -> Optional[bytes]:
+        """Next chunk; b"" if none arrived within timeout; None once the stream has ended"""
+        try:
+            chunk = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return b""
+        if chunk is self._END:
+            self._queue.put(self._END)
+            if self.error is not None:
+                raise self.error
+            return None
+        return chunk
+
+
+class SegmentDecoder:
+    """Turns streamed mp3 bytes into Sounds of growing size for one mixer channel.
+
+    Segments start at `first` bytes and double up to `largest`. Every segment
+    after the first is decoded with the last `overlap` frames of the previous
+    one in front, so its first frames have their bit reservoir; the samples
+    of those frames are then cut off, so segments join without gaps or
+    repeats. Needs an initialized mixer.
+    """
+
+    def __init__(self, first: int = STREAM_FIRST_SEGMENT, largest: int = STREAM_MAX_SEGMENT,
+                 overlap: int = STREAM_OVERLAP_FRAMES):
+        self.largest = largest
+        self.overlap = overlap
+        self.splitter = Mp3FrameSplitter()
+        self.target = first
+        self._frames = []       # whole frames not decoded yet
+        self._size = 0
+        self._carry = []        # tail of the previous segment
+
+    def feed(self, chunk: bytes) -> List["pygame.mixer.Sound"]:
+        for frame in self.splitter.feed(chunk):
+            self._frames.append(frame)
+            self._size += len(frame)
+        return [self._decode()] if self._size >= self.target else []
+
+    def flush(self) -> List["pygame.mixer.Sound"]:
+        return [self._decode()] if self._frames else []
+
+    def _decode(self):
+        sound = pygame.mixer.Sound(file=io.BytesIO(b"".join(self._carry + self._frames)))
+        if self._carry:
+            sound = pygame.mixer.Sound(buffer=sound.get_raw()[self._decoded_bytes(len(self._carry)):])
+        self._carry = self._frames[-self.overlap:] if self.overlap else []
+        self._frames = []
+        self._size = 0
+        self.target = min(self.target * 2, self.largest)
+        return sound
+
+    def _decoded_bytes(self, frame_count: int) -> int:
+        """Size of `frame_count` frames once decoded to the mixer's format"""
+        frequency, size, channels = pygame.mixer.get_init()
+        samples = frame_count * self.splitter.samples_per_frame * frequency // self.splitter.sample_rate
+        return samples * (abs(size) // 8) * channels
+
+
+class Utterance:
+    """Clips queued for playback as one unit; cancelling it drops the clips not yet played.
+
+    A clip is mp3 bytes, a Future that resolves to them, or an AudioStream,
+    so synthesis can still be running when the clip is queued. `func` is
+    polled while the utterance plays; returning False cancels it, as with the
+    old TTS loop.
+    """
+
+    def __init__(self, output: "AudioOutput", func: Optional[Callable] = None):
+        self.output = output
+        self.func = func
+        self.generation = output.generation
+        self.cancelled = False
+        self._pending = 0
+        self._closed = False
+        self._done = threading.Condition()
+
+    def add(self, clip):
+        with self._done:
+            if self._closed:
+                raise RuntimeError("utterance is closed")
+            self._pending += 1
+        self.output._queue.put((self, clip))
+
+    def close(self):
+        """No more clips will be added"""
+        with self._done:
+            self._closed = True
+            self._done.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every clip was played or dropped. True if it played to the end."""
+        with self._done:
+            self._done.wait_for(lambda: self._closed and self._pending == 0, timeout)
+        return not self.cancelled
+
+    def cancel(self):
+        self.cancelled = True
+
+    @property
+    def active(self) -> bool:
+        return not self.cancelled and self.generation == self.output.generation
+
+    def _clip_done(self):
+        with self._done:
+            self._pending -= 1
+            self._done.notify_all()
+
+
+class AudioOutput:
+    """Long-lived audio output: the mixer is opened once and fed from memory.
+
+    One thread owns the mixer and plays queued clips in order, loading mp3
+    bytes straight from a BytesIO, so no file is written between synthesis
+    and playback and concurrent speakers queue up instead of overwriting
+    each other's audio. An AudioStream clip starts playing as soon as its
+    first few frames arrive: whole frames are decoded into Sounds segment by
+    segment and chained on one channel while the rest is still synthesizing.
+    `interrupt` stops whatever is playing and drops everything queued so far;
+    `close` shuts the device at exit.
+    """
+
+    def __init__(self, frequency: int = MIXER_FREQUENCY, channels: int = MIXER_CHANNELS, buffer: int = MIXER_BUFFER):
+        self.frequency = frequency
+        self.channels = channels
+        self.buffer = buffer
+
+        self.generation = 0   # bumped by interrupt(); older utterances are dropped
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def utterance(self, func: Optional[Callable] = None) -> Utterance:
+        self._ensure_thread()
+        return Utterance(self, func)
+
+    def play(self, clip, func: Optional[Callable] = None) -> bool:
+        """Queue one clip and block until it finished; False if it was cut off"""
+        utterance = self.utterance(func)
+        utterance.add(clip)
+        utterance.close()
+        return utterance.wait()
+
+    def interrupt(self):
+        """Stop the current clip and drop every utterance queued before this call"""
+        with self._lock:
+            self.generation += 1
+
+    def close(self):
+        self.interrupt()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=2)
+
+    # ---------- Playback thread ----------
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name="audio-output")
+                self._thread.start()
+
+    def _ensure_mixer(self):
+        if not pygame.mixer.get_init():
+            pygame.mixer.pre_init(self.frequency, -16, self.channels, self.buffer)
+            pygame.mixer.init()
+
+    def _run(self):
+        clock = pygame.time.Clock()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                utterance, clip = item
+                try:
+                    if utterance.active:
+                        self._play(utterance, clip, clock)
+                    else:
+                        utterance.cancel()
+                except Exception as e:
+                    print(f"Error in TTS : {e}")
+                finally:
+                    utterance._clip_done()
+        finally:
+            try:
+                if pygame.mixer.get_init():
+                    pygame.mixer.music.stop()
+                    pygame.mixer.quit()
+            except Exception as e:
+                print(f"Error closing the mixer: {e}")
+
+    def _play(self, utterance: Utterance, clip, clock):
+        if isinstance(clip, AudioStream):
+            return self._play_stream(utterance, clip, clock)
+        data = clip.result() if hasattr(clip, "result") else clip
+        if not utterance.active:
+            # Interrupted while the clip was still being synthesized
+            utterance.cancel()
+            return
+        if not data:
+            return
+        self._ensure_mixer()
+        pygame.mixer.music.load(io.BytesIO(data), audio_format(data))
+        pygame.mixer.music.play()
+        while pygame.mixer.music.get_busy():
+            if not utterance.active or (utterance.func is not None and not utterance.func()):
+                utterance.cancel()
+                pygame.mixer.music.stop()
+                return
+            clock.tick(50)
+
+    def _stopped(self, utterance: Utterance) -> bool:
+        return not utterance.active or (utterance.func is not None and not utterance.func())
+
+    def _play_stream(self, utterance: Utterance, stream: AudioStream, clock):
+        self._ensure_mixer()
+        channel = pygame.mixer.Channel(0)
+        decoder = SegmentDecoder()
+        segments = deque()      # decoded Sounds waiting for the channel
+
+        def feed():
+            if segments and not channel.get_busy():
+                channel.play(segments.popleft())
+            if segments and channel.get_queue() is None:
+                channel.queue(segments.popleft())
+
+        try:
+            while True:
+                if self._stopped(utterance):
+                    utterance.cancel()
+                    return
+                chunk = stream.read(timeout=0.02)
+                if chunk is None:
+                    break
+                if not decoder.splitter.sample_rate and audio_format(chunk) != "mp3":
+                    return self._play(utterance, chunk, clock)
+                segments.extend(decoder.feed(chunk))
+                feed()
+            segments.extend(decoder.flush())
+
+            while segments or channel.get_busy():
+                if self._stopped(utterance):
+                    utterance.cancel()
+                    return
+                feed()
+                clock.tick(50)
+        finally:
+            # Idle after a clean finish; otherwise don't talk over the next clip
+            channel.stop()
+
+
+if __name__ == "__main__":
+    # Stream canned mp3 frames through the splitter, decoder and player: python audio_output.py
+    import os
+    import time
+
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    # One frame of silence: MPEG-2 Layer III, 48 kbps, 24 kHz, mono; 144 bytes, 576 samples (24 ms)
+    FIXTURE_FRAME = bytes([0xFF, 0xF3, 0x64, 0xC0]) + bytes(140)
+    FIXTURE_ID3 = b"ID3\x04\x00\x00\x00\x00\x00\x05tags!"
+
+    def canned_stream(frames, chunk_size=1021, delay=0.01, error=None):
+        """An AudioStream fed from a thread like edge_tts feeds it, in chunks that split frames"""
+        stream = AudioStream()
+        data = FIXTURE_ID3 + FIXTURE_FRAME * frames
+
+        def produce():
+            for i in range(0, len(data), chunk_size):
+                time.sleep(delay)
+                stream.put(data[i:i + chunk_size])
+            stream.close(error)
+
+        threading.Thread(target=produce, daemon=True).start()
+        return stream
+
+    # Frame boundaries: tag skipped, junk between frames resynced, partial frames held back
+    splitter = Mp3FrameSplitter()
+    data = FIXTURE_ID3 + FIXTURE_FRAME * 10 + b"\x00junk" + FIXTURE_FRAME * 3 + FIXTURE_FRAME[:50]
+    frames = []
+    for i in range(0, len(data), 37):
+        frames += splitter.feed(data[i:i + 37])
+    assert frames == [FIXTURE_FRAME] * 13, len(frames)
+    assert (splitter.sample_rate, splitter.samples_per_frame) == (24000, 576)
+    print(f"splitter: {len(frames)} whole frames, {len(splitter._buffer)} bytes held back")
+
+    # Growing segments whose trimmed lengths add up to exactly the streamed audio
+    output = AudioOutput()
+    output._ensure_mixer()
+    decoder = SegmentDecoder()
+    frame_count = 400
+    segments = []
+    payload = FIXTURE_ID3 + FIXTURE_FRAME * frame_count
+    for i in range(0, len(payload), 1021):
+        segments += decoder.feed(payload[i:i + 1021])
+    segments += decoder.flush()
+    lengths = [segment.get_length() for segment in segments]
+    expected = frame_count * 576 / 24000
+    assert lengths == sorted(lengths[:-1]) + lengths[-1:], lengths
+    assert abs(sum(lengths) - expected) < 1e-6, (sum(lengths), expected)
+    print(f"decoder: {len(segments)} segments {[round(length, 3) for length in lengths]}, "
+          f"{sum(lengths):.3f}s of {expected:.3f}s")
+
+    # Playback starts after the first segment, not after the whole clip
+    started = time.perf_counter()
+    utterance = output.utterance()
+    stream = canned_stream(100)
+    utterance.add(stream)
+    utterance.close()
+    while not pygame.mixer.Channel(0).get_busy():
+        time.sleep(0.005)
+    first_sound = time.perf_counter() - started
+    assert utterance.wait(timeout=10)
+    print(f"playback: first sound after {first_sound * 1000:.0f} ms, done after {time.perf_counter() - started:.2f}s "
+          f"(clip {100 * 0.024:.2f}s)")
+
+    # Interrupt mid-stream stops the channel and reports the utterance as cut off
+    utterance = output.utterance()
+    utterance.add(canned_stream(200))
+    utterance.close()
+    time.sleep(0.5)
+    output.interrupt()
+    assert not utterance.wait(timeout=2) and not pygame.mixer.Channel(0).get_busy()
+    print("interrupt: stopped mid-stream")
+
+    # A producer that fails ends playback instead of hanging it, and the next clip still plays
+    started = time.perf_counter()
+    output.play(canned_stream(30, error=RuntimeError("connection lost")))
+    assert time.perf_counter() - started < 2 and not pygame.mixer.Channel(0).get_busy()
+    assert output.play(canned_stream(10))
+    print("error: stream error ended playback")
+
+    # A stalled producer doesn't hold the player once the speaker gives up
+    stalled = AudioStream()
+    stalled.put(FIXTURE_FRAME * 40)
+    deadline = time.perf_counter() + 0.5
+    assert not output.play(stalled, lambda r=None: time.perf_counter() < deadline)
+    print("cancel: stalled stream dropped")
+
+    output.close()
@@ -1,10 +1,20 @@
 import os
-import json
 import datetime
 import requests
 from dotenv import dotenv_values
 from groq import Groq
 
+try:
+    from .conversation_store import get_conversation_store
+    from .context_builder import ContextBuilder
+    from .conversation_summary import ConversationSummarizer
+    from .response_cache import SemanticResponseCache
+except ImportError:
+    from conversation_store import get_conversation_store
+    from context_builder import ContextBuilder
+    from conversation_summary import ConversationSummarizer
+    from response_cache import SemanticResponseCache
+
 class ChatBotEngine:
     def __init__(self):
         # ---------- Find project root ----------
@@ -30,23 +40,29 @@ class ChatBotEngine:
         # ---------- Init Groq client ----------
         self.client = Groq(api_key=self.GROQ_API_KEY)
 
-        # ---------- Data folder & chatlog ----------
+        # ---------- Data folder & conversation store ----------
         self.data_dir = os.path.join(self.BASE_DIR, "data")
         os.makedirs(self.data_dir, exist_ok=True)
-        self.chatlog_path = os.path.join(self.data_dir, "ChatLog.json")
-
-        # Load or initialize chat log
-        if os.path.exists(self.chatlog_path):
-            try:
-                with open(self.chatlog_path, "r", encoding="utf-8") as f:
-                    self.messages = json.load(f)
-            except Exception:
-                print("[warning] Chat log exists but failed to parse; initializing empty chat log.")
-                self.messages = []
-        else:
-            self.messages = []
-            with open(self.chatlog_path, "w", encoding="utf-8") as f:
-                json.dump([], f, indent=4)
+        # Shared with the realtime module; imports ChatLog.json on first run
+        self.store = get_conversation_store(self.data_dir)
+        # Rows fetched per question; the token budget decides how many are sent
+        self.history_limit = int(self.env.get("CHAT_HISTORY_LIMIT", 200))
+        self.context = ContextBuilder(budget=int(self.env.get("CHAT_CONTEXT_TOKENS", 4000)))
+        # Turns older than the newest CHAT_SUMMARY_KEEP are carried as a running summary
+        self.summarizer = ConversationSummarizer(
+            self.client, self.store, keep_recent=int(self.env.get("CHAT_SUMMARY_KEEP", 20)))
+
+        # ---------- Response cache ----------
+        # Near-duplicate questions that don't depend on time or context skip the
+        # Groq call. Opt-in: a stored answer can't know what changed since.
+        self.cache = None
+        if str(self.env.get("CHAT_CACHE", "False")).lower() == "true":
+            self.cache = SemanticResponseCache(
+                max_size=int(self.env.get("CHAT_CACHE_SIZE", 256)),
+                threshold=float(self.env.get("CHAT_CACHE_THRESHOLD", 0.8)),
+                ttl=float(self.env.get("CHAT_CACHE_TTL", 7 * 24 * 3600)),
+                path=os.path.join(self.data_dir, "ResponseCache.json"),
+            )
 
         # ---------- System prompt ----------
         self.system_message = f"""Hello, I am {self.Username}. You are a very accurate and advanced AI chatbot named {self.Assistantname} which has real-time up-to-date information from the internet.
@@ -78,22 +94,42 @@ class ChatBotEngine:
         info += f"Time: {now.strftime('%H')} hours, {now.strftime('%M')} minutes, {now.strftime('%S')} seconds.\n"
         return info
 
+    def summarize_in_background(self):
+        """Fold old turns into the running summary; call when nobody is waiting on a reply"""
+        self.summarizer.schedule()
+
     def answer_modifier(self, answer):
         lines = answer.split('\n')
         return '\n'.join([line for line in lines if line.strip()])
 
     def ask(self, query):
-        try:
-            # Load latest chat history
-            if os.path.exists(self.chatlog_path):
-                with open(self.chatlog_path, "r", encoding="utf-8") as f:
-                    self.messages = json.load(f)
+        return self.answer_modifier("".join(self.ask_stream(query)).strip())
 
-            self.messages.append({"role": "user", "content": query})
+    def ask_stream(self, query):
+        """Yield the answer as Groq generates it; the turn is saved once it completes"""
+        try:
+            cached = self.cache.get(query) if self.cache is not None else None
+            if cached is not None:
+                answer, similarity = cached
+                print(f"[cache] Response cache hit ({similarity:.2f}); hit rate {self.cache.stats()['hit_rate']}")
+                self.store.append_many([{"role": "user", "content": query},
+                                        {"role": "assistant", "content": answer}], source="cache")
+                yield answer
+                return
+
+            # Summary of older turns + the turns after it, trimmed to the token budget
+            summary, summary_upto = self.summarizer.current()
+            history = self.store.recent(limit=self.history_limit, after_id=summary_upto)
+            user_message = {"role": "user", "content": query}
+            system_messages = self.system_chatbot + [{"role": "system", "content": self.get_realtime_info()}]
+            if summary:
+                system_messages.append(self.summarizer.as_system_message(summary))
+            messages, stats = self.context.build(system_messages, history, user_message)
+            print(f"[context] {self.context.describe(stats)}")
 
             completion = self.client.chat.completions.create(
                 model="llama-3.1-8b-instant",
-                messages=self.system_chatbot + [{"role": "system", "content": self.get_realtime_info()}] + self.messages,
+                messages=messages,
                 max_tokens=1024,
                 temperature=0.7,
                 top_p=1,
@@ -102,25 +138,32 @@ class ChatBotEngine:
             )
 
             answer = ""
+            usage = None
             for chunk in completion:
-                if chunk.choices[0].delta.content:
-                    answer += chunk.choices[0].delta.content
-
-            answer = answer.replace("</s>", "").strip()
-            self.messages.append({"role": "assistant", "content": answer})
-
-            # Save chat log
-            with open(self.chatlog_path, "w", encoding="utf-8") as f:
-                json.dump(self.messages, f, indent=4, ensure_ascii=False)
-
-            return self.answer_modifier(answer)
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    delta = delta.replace("</s>", "")
+                    answer += delta
+                    yield delta
+                # Groq reports usage on the last streamed chunk
+                x_groq = getattr(chunk, "x_groq", None)
+                if x_groq is not None and getattr(x_groq, "usage", None):
+                    usage = x_groq.usage
+            if usage:
+                print(f"[context] Groq usage: prompt {usage.prompt_tokens}, completion {usage.completion_tokens}")
+
+            # Save the turn (two inserts, nothing rewritten)
+            self.store.append_many([user_message, {"role": "assistant", "content": answer.strip()}], source="chatbot")
+            if self.cache is not None and answer.strip():
+                self.cache.set(query, answer.strip())
+                self.cache.save()
 
         except requests.exceptions.RequestException as e:
             print(f"[error] Connection error: {e}")
-            return "Connection error, please try again."
+            yield "Connection error, please try again."
         except Exception as e:
             print(f"[error] Unexpected error: {e}")
-            return "An error occurred, please try again."
+            yield "An error occurred, please try again."
 
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+import math
+from typing import Dict, List, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Role and formatting tokens the chat template adds around each message
+MESSAGE_OVERHEAD = 4
+# Tokens that prime the assistant's reply
+REPLY_PRIMING = 3
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken when it is installed, otherwise estimates.
+
+    cl100k_base is close to the Llama 3 tokenizer for English text. The
+    fallback takes the larger of chars/4 and words*4/3, which slightly
+    overestimates and so errs on the side of staying inside the budget.
+    """
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.get_encoding(encoding)
+            except Exception as e:
+                print(f"[warning] tiktoken encoding '{encoding}' unavailable, estimating tokens: {e}")
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return self.estimate(text)
+
+    @staticmethod
+    def estimate(text: str) -> int:
+        return max(math.ceil(len(text) / 4), math.ceil(len(text.split()) * 4 / 3))
+
+    def count_message(self, message: Dict[str, str]) -> int:
+        return self.count(message.get("content", "")) + MESSAGE_OVERHEAD
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        return sum(self.count_message(m) for m in messages) + REPLY_PRIMING
+
+
+class ContextBuilder:
+    """Fits chat history into a token budget for one completion call.
+
+    System messages and the new user message are always sent. History is
+    added newest first until the next message would overflow the budget, so
+    the oldest turns are the ones dropped.
+    """
+
+    def __init__(self, budget: int = 4000, counter: TokenCounter = None):
+        self.budget = int(budget)
+        self.counter = counter or TokenCounter()
+
+    def build(self, system_messages: List[Dict[str, str]], history: List[Dict[str, str]],
+              user_message: Dict[str, str]) -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+        system_tokens = sum(self.counter.count_message(m) for m in system_messages)
+        query_tokens = self.counter.count_message(user_message)
+        remaining = self.budget - system_tokens - query_tokens - REPLY_PRIMING
+
+        kept = []
+        history_tokens = 0
+        for message in reversed(history):
+            tokens = self.counter.count_message(message)
+            if tokens > remaining:
+                break
+            kept.append(message)
+            history_tokens += tokens
+            remaining -= tokens
+        kept.reverse()
+
+        # Don't open the history with an answer whose question was cut off
+        while kept and kept[0].get("role") == "assistant":
+            history_tokens -= self.counter.count_message(kept.pop(0))
+
+        stats = {
+            "system": system_tokens,
+            "history": history_tokens,
+            "history_messages": len(kept),
+            "dropped_messages": len(history) - len(kept),
+            "query": query_tokens,
+            "total": system_tokens + history_tokens + query_tokens + REPLY_PRIMING,
+            "budget": self.budget,
+        }
+        return system_messages + kept + [user_message], stats
+
+    @staticmethod
+    def describe(stats: Dict[str, int]) -> str:
+        return (f"{stats['total']}/{stats['budget']} tokens "
+                f"(system {stats['system']}, history {stats['history']} in {stats['history_messages']} msgs, "
+                f"{stats['dropped_messages']} dropped, query {stats['query']})")
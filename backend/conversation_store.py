@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+class ConversationStore:
+    """Append-only chat history shared by the chatbot and realtime modules.
+
+    Messages live in one SQLite table indexed by (session, created_at). The
+    database runs in WAL mode, so writers in different threads or modules only
+    ever insert rows and readers are never blocked by them. Each thread gets
+    its own connection, because sqlite3 connections cannot be shared.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            source TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_messages_session_time ON messages (session, created_at);
+        CREATE INDEX IF NOT EXISTS idx_messages_time ON messages (created_at);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, path: str, session: str = None):
+        self.path = path
+        self.session = session or time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}"
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------- Writes ----------
+
+    def append(self, role: str, content: str, source: str = None):
+        self.append_many([{"role": role, "content": content}], source=source)
+
+    def append_many(self, messages: List[Dict[str, str]], source: str = None):
+        """Insert messages in one transaction, in order"""
+        now = time.time()
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO messages (session, created_at, role, content, source) VALUES (?, ?, ?, ?, ?)",
+                [(self.session, now, m["role"], m["content"], source) for m in messages],
+            )
+
+    # ---------- Reads ----------
+
+    def recent(self, limit: Optional[int] = None, session: str = None, after_id: int = 0) -> List[Dict[str, str]]:
+        """Latest messages (newer than `after_id`) as chat-completion dicts, oldest first"""
+        query = "SELECT role, content FROM messages WHERE id > ?"
+        params = [after_id]
+        if session:
+            query += " AND session = ?"
+            params.append(session)
+        query += " ORDER BY id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        rows = self._connection().execute(query, params).fetchall()
+        return [{"role": role, "content": content} for role, content in reversed(rows)]
+
+    def since(self, timestamp: float, session: str = None) -> List[Dict[str, str]]:
+        """Messages created at or after `timestamp`, oldest first"""
+        query = "SELECT role, content FROM messages WHERE created_at >= ?"
+        params = [timestamp]
+        if session:
+            query += " AND session = ?"
+            params.append(session)
+        rows = self._connection().execute(query + " ORDER BY id", params).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def rows_between(self, after_id: int, upto_id: int, limit: int = -1) -> List[Tuple[int, str, str]]:
+        """(id, role, content) for after_id < id <= upto_id, oldest first"""
+        return self._connection().execute(
+            "SELECT id, role, content FROM messages WHERE id > ? AND id <= ? ORDER BY id LIMIT ?",
+            (after_id, upto_id, limit),
+        ).fetchall()
+
+    def last_id(self) -> int:
+        row = self._connection().execute("SELECT MAX(id) FROM messages").fetchone()
+        return row[0] or 0
+
+    def id_before_last(self, n: int) -> int:
+        """Id of the message that has `n` newer messages after it (0 if there are fewer)"""
+        row = self._connection().execute(
+            "SELECT id FROM messages ORDER BY id DESC LIMIT 1 OFFSET ?", (n,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def count(self, session: str = None) -> int:
+        if session:
+            row = self._connection().execute("SELECT COUNT(*) FROM messages WHERE session = ?", (session,)).fetchone()
+        else:
+            row = self._connection().execute("SELECT COUNT(*) FROM messages").fetchone()
+        return row[0]
+
+    # ---------- Meta / migration ----------
+
+    def get_meta(self, key: str, default: str = None) -> Optional[str]:
+        row = self._connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: str):
+        self.set_meta_items({key: value})
+
+    def set_meta_items(self, items: Dict[str, str]):
+        """Set several meta keys in one transaction"""
+        with self._connection() as conn:
+            conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", list(items.items()))
+
+    def migrate_json(self, json_path: str) -> int:
+        """One-time import of a legacy ChatLog.json list. Returns the number of messages imported."""
+        if self.get_meta("chatlog_migrated") or not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                messages = json.load(f)
+        except Exception as e:
+            print(f"[warning] Could not read {json_path} for migration: {e}")
+            return 0
+
+        messages = [m for m in messages if isinstance(m, dict) and m.get("role") and m.get("content") is not None]
+        # The JSON log has no timestamps; keep its order just before the file's mtime
+        base = os.path.getmtime(json_path) - len(messages) * 1e-3
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT INTO messages (session, created_at, role, content, source) VALUES (?, ?, ?, ?, ?)",
+                [("legacy", base + i * 1e-3, m["role"], m["content"], "ChatLog.json") for i, m in enumerate(messages)],
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", ("chatlog_migrated", str(time.time())))
+        print(f"[info] Migrated {len(messages)} message(s) from {json_path}")
+        return len(messages)
+
+
+# ---------- Shared instance ----------
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_conversation_store(data_dir: str) -> ConversationStore:
+    """Process-wide store in `data_dir`, so every module writes to the same session"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = ConversationStore(os.path.join(data_dir, "Conversation.db"))
+                store.migrate_json(os.path.join(data_dir, "ChatLog.json"))
+                _store = store
+    return _store
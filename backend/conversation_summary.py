@@ -0,0 +1,92 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+SUMMARY_KEY = "summary"
+SUMMARY_UPTO_KEY = "summary_upto_id"
+
+SUMMARY_PROMPT = (
+    "You maintain the long-term memory of a voice assistant. Merge the existing summary with the new "
+    "conversation excerpt into one updated summary. Keep facts about the user (name, preferences, plans), "
+    "open questions and decisions; drop small talk and anything already answered that will not matter "
+    "later. Write plain sentences, at most {max_words} words. Reply with the summary only."
+)
+
+
+class ConversationSummarizer:
+    """Folds older turns of the conversation store into a running summary.
+
+    The summary and the id of the last message it covers are kept in the
+    store's meta table, next to the messages themselves. Turns newer than that
+    id are sent verbatim; everything up to it is represented by the summary.
+    `schedule` runs one pass on a background thread, so no request ever waits
+    on a summarization call.
+    """
+
+    def __init__(self, client, store, model: str = "llama-3.1-8b-instant",
+                 keep_recent: int = 20, min_batch: int = 10, max_batch: int = 60, max_words: int = 200):
+        self.client = client
+        self.store = store
+        self.model = model
+        self.keep_recent = keep_recent    # newest messages never summarized
+        self.min_batch = min_batch        # don't call the model for fewer than this
+        self.max_batch = max_batch        # messages folded in per call
+        self.max_words = max_words
+
+        self._running = threading.Lock()
+
+    def current(self) -> Tuple[str, int]:
+        """(summary text, id of the last message it covers)"""
+        summary = self.store.get_meta(SUMMARY_KEY, "")
+        upto_id = int(self.store.get_meta(SUMMARY_UPTO_KEY, "0"))
+        return summary, upto_id
+
+    def as_system_message(self, summary: str) -> Optional[Dict[str, str]]:
+        if not summary:
+            return None
+        return {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+
+    def schedule(self):
+        """Run a summarization pass in the background unless one is already running"""
+        if not self._running.acquire(blocking=False):
+            return
+        threading.Thread(target=self._run, daemon=True, name="summarizer").start()
+
+    def _run(self):
+        try:
+            # Catch up in max_batch steps after a long gap (or a fresh migration)
+            while self.summarize_once():
+                pass
+        except Exception as e:
+            print(f"[warning] Conversation summary failed: {e}")
+        finally:
+            self._running.release()
+
+    def summarize_once(self) -> bool:
+        """Fold the next batch of old messages into the summary. Returns True if it did."""
+        summary, upto_id = self.current()
+        boundary = self.store.id_before_last(self.keep_recent)
+        if boundary <= upto_id:
+            return False
+
+        batch = self.store.rows_between(upto_id, boundary, self.max_batch)
+        if len(batch) < min(self.min_batch, self.max_batch):
+            return False
+
+        excerpt = "\n".join(f"{role}: {content}" for _, role, content in batch)
+        completion = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT.format(max_words=self.max_words)},
+                {"role": "user", "content": f"Existing summary:\n{summary or '(none)'}\n\nNew excerpt:\n{excerpt}"},
+            ],
+            max_tokens=self.max_words * 2,
+            temperature=0.2,
+            stream=False,
+        )
+        new_summary = completion.choices[0].message.content.strip()
+        if not new_summary:
+            return False
+
+        self.store.set_meta_items({SUMMARY_KEY: new_summary, SUMMARY_UPTO_KEY: str(batch[-1][0])})
+        print(f"[info] Summarized {len(batch)} older message(s); summary is {len(new_summary.split())} words")
+        return True
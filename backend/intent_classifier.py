@@ -0,0 +1,337 @@
+import re
+import time
+import threading
+from typing import List, Optional
+
+# Automation vocabulary from the decision model preamble: spoken phrase → action
+AUTOMATION_PHRASES = {
+    # Social
+    "open reels": "open reels",
+    "open videos": "open videos",
+    "show stories": "show stories",
+    "open story": "open story",
+    "close story": "close story",
+    "next story": "next story",
+    "previous story": "previous story",
+    "go to home page": "go to home page",
+    "go home": "go to home page",
+    # Media
+    "mute": "mute",
+    "unmute": "unmute",
+    "mute the volume": "mute",
+    "unmute the volume": "unmute",
+    "pause": "pause",
+    "play": "play",
+    "resume": "play",
+    "mute reels": "mute reels",
+    "pause video": "pause video",
+    "play video": "play video",
+    "mute video": "mute video",
+    "unmute video": "unmute video",
+    "next video": "next video",
+    "previous video": "previous video",
+    "full screen": "fullscreen",
+    "fullscreen": "fullscreen",
+    "seek forward": "seek forward",
+    "seek backward": "seek backward",
+    # Scroll
+    "scroll up": "scroll up",
+    "scroll down": "scroll down",
+    "scroll feed up": "scroll feed up",
+    "scroll feed down": "scroll feed down",
+    "stop scrolling": "stop scrolling",
+    "stop scroll": "stop scrolling",
+    "swipe left": "swipe left",
+    "swipe right": "swipe right",
+    # Window
+    "minimize this": "minimize_active_window",
+    "minimize current window": "minimize_active_window",
+    "minimize window": "minimize_active_window",
+    "minimize everything": "show_desktop",
+    "show desktop": "show_desktop",
+    # System
+    "take screenshot": "take_screenshot",
+    "take a screenshot": "take_screenshot",
+    "screenshot": "take_screenshot",
+}
+
+# Sites that live in Chrome tabs rather than separate windows
+CHROME_TAB_TARGETS = {"youtube", "instagram", "facebook", "merolagani"}
+
+# Application windows SystemAutomation knows; "switch to X" / "minimize X"
+# for anything else ("switch to dark mode") is left to the LLM
+APP_TARGETS = {
+    "chrome", "brave", "notepad", "paint", "vs code", "vscode", "code", "settings", "camera",
+    "calculator", "explorer", "file explorer", "cmd", "command prompt", "powershell", "whatsapp",
+    "control panel", "word", "excel", "powerpoint",
+}
+
+# What "open X" / "close X" can act on: SystemAutomation.apps, the names
+# main.normalize_app_name maps onto them, and the sites with their own module
+OPEN_TARGETS = APP_TARGETS | CHROME_TAB_TARGETS | {
+    "google chrome", "whatsapp desktop", "controlpanel", "mycomputer", "my computer", "this pc", "power shell",
+}
+
+# "switch to the next tab" names a position, not a tab
+RELATIVE_WORDS = {"next", "previous", "last", "first", "other", "new", "this", "that", "another", "same", "it"}
+
+# Volume and brightness are percentages
+MAX_LEVEL = 100
+
+EXIT_PHRASES = {"exit", "quit", "bye", "bye bye", "goodbye", "good bye"}
+
+FILLER_PREFIXES = ("please ", "can you ", "could you ", "would you ", "hey ")
+
+# Anything that suggests more than one task or a real question goes to the LLM
+COMPOUND_MARKERS = re.compile(r",|\b(and|then|also|after that)\b")
+QUESTION_MARKERS = re.compile(r"\b(what|who|why|how|when|where|which|whose|is|are|do|does|tell|explain)\b")
+SIMPLE_TARGET = re.compile(r"^[a-z][a-z0-9 .'-]{0,40}$")
+
+VALUE_PATTERNS = [
+    (re.compile(r"^set (?:the )?volume (?:to )?(\d{1,3})(?: percent| %)?$"), "set_volume {0}"),
+    (re.compile(r"^(?:increase|raise|turn up) (?:the )?volume by (\d{1,3})(?: percent| %)?$"), "change_volume_by {0}"),
+    (re.compile(r"^(?:decrease|lower|reduce|turn down) (?:the )?volume by (\d{1,3})(?: percent| %)?$"), "change_volume_by -{0}"),
+    (re.compile(r"^set (?:the )?brightness (?:to )?(\d{1,3})(?: percent| %)?$"), "set_brightness {0}"),
+    (re.compile(r"^(?:increase|raise) (?:the )?brightness by (\d{1,3})(?: percent| %)?$"), "change_brightness_by {0}"),
+    (re.compile(r"^(?:decrease|lower|reduce) (?:the )?brightness by (\d{1,3})(?: percent| %)?$"), "change_brightness_by -{0}"),
+]
+
+# Labelled corpus: query → expected tasks (None means the LLM must decide)
+LABELLED_CORPUS = [
+    ("scroll up", ["automation scroll up"]),
+    ("Scroll feed down.", ["automation scroll feed down"]),
+    ("stop scrolling", ["automation stop scrolling"]),
+    ("mute", ["automation mute"]),
+    ("Mute the volume", ["automation mute"]),
+    ("unmute", ["automation unmute"]),
+    ("next video", ["automation next video"]),
+    ("pause video", ["automation pause video"]),
+    ("full screen", ["automation fullscreen"]),
+    ("swipe left", ["automation swipe left"]),
+    ("next story", ["automation next story"]),
+    ("open reels", ["automation open reels"]),
+    ("show desktop", ["automation show_desktop"]),
+    ("minimize everything", ["automation show_desktop"]),
+    ("minimize this", ["automation minimize_active_window"]),
+    ("minimize chrome", ["automation minimize_active_window chrome"]),
+    ("take screenshot", ["automation take_screenshot"]),
+    ("Take a screenshot please", ["automation take_screenshot"]),
+    ("set volume to 50", ["automation set_volume 50"]),
+    ("increase volume by 30", ["automation change_volume_by 30"]),
+    ("decrease volume by 50", ["automation change_volume_by -50"]),
+    ("set brightness to 70", ["automation set_brightness 70"]),
+    ("decrease brightness by 20", ["automation change_brightness_by -20"]),
+    ("switch to vs code", ["automation switch_apps vs code"]),
+    ("switch to chrome", ["automation switch_apps chrome"]),
+    ("switch to youtube tab", ["automation switch_chrome_tab youtube"]),
+    ("switch to instagram", ["automation switch_chrome_tab instagram"]),
+    ("switch to gmail tab", ["automation switch_chrome_tab gmail"]),
+    ("open the calculator", ["open calculator"]),
+    ("launch vs code", ["open vs code"]),
+    ("open instagram", ["open instagram"]),
+    ("open chrome", ["open chrome"]),
+    ("Open notepad.", ["open notepad"]),
+    ("can you open whatsapp", ["open whatsapp"]),
+    ("close notepad", ["close notepad"]),
+    ("play the song despacito", ["youtube search despacito"]),
+    ("play let her go on youtube", ["youtube search let her go"]),
+    ("search python tutorials on youtube", ["youtube search python tutorials"]),
+    ("search machine learning on google", ["google search machine learning"]),
+    ("google search quantum computing", ["google search quantum computing"]),
+    ("generate image of a lion", ["generate image a lion"]),
+    ("bye", ["exit"]),
+    ("goodbye", ["exit"]),
+    ("hey omnis open chrome", ["open chrome"]),
+    # Must fall through to the LLM
+    ("open chrome and tell me about mahatma gandhi", None),
+    ("open facebook, telegram and close whatsapp", None),
+    ("what is python programming language?", None),
+    ("who is the indian prime minister", None),
+    ("how do I open a file in python", None),
+    ("tell me about facebook's recent update", None),
+    ("write an application for sick leave", None),
+    ("what's the time?", None),
+    ("play music and open chrome", None),
+    ("thanks, i really liked it.", None),
+    # Catch-all shapes that aren't commands
+    ("switch to dark mode", None),
+    ("minimize the risk", None),
+    ("google is down", None),
+    ("play a game with me", None),
+    ("play it safe", None),
+    ("play despacito", None),
+    ("close your eyes", None),
+    ("close the deal", None),
+    ("open source", None),
+    ("open my heart", None),
+    ("open it", None),
+    ("close it", None),
+    ("open up", None),
+    ("launch sequence", None),
+    ("switch to the next tab", None),
+    ("set volume to 500", None),
+    ("increase brightness by 150", None),
+]
+
+
+class FastIntentClassifier:
+    """Rule-based classifier that answers deterministic commands without the LLM."""
+
+    def __init__(self, funcs: List[str], assistant_name: str = "Assistant"):
+        self.funcs = list(funcs)
+        self.assistant_name = (assistant_name or "").lower().strip()
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.time_spent = 0.0
+
+    def _allowed(self, task: str) -> bool:
+        return any(task.startswith(func) for func in self.funcs)
+
+    def normalize(self, query: str) -> str:
+        """Lowercase, drop punctuation and polite fillers, collapse spaces."""
+        text = query.lower().strip()
+        text = re.sub(r"[^\w\s%'-]", " ", text)
+        text = " ".join(text.split())
+
+        prefixes = FILLER_PREFIXES + ((self.assistant_name + " ",) if self.assistant_name else ())
+        changed = True
+        while changed:
+            changed = False
+            for prefix in prefixes:
+                if text.startswith(prefix):
+                    text = text[len(prefix):]
+                    changed = True
+        if text.endswith(" please"):
+            text = text[:-len(" please")]
+        if self.assistant_name and text.endswith(" " + self.assistant_name):
+            text = text[:-len(self.assistant_name) - 1]
+        return text.strip()
+
+    def _match(self, raw: str) -> Optional[List[str]]:
+        text = self.normalize(raw)
+        if not text:
+            return None
+
+        if text in EXIT_PHRASES or text in {f"{p} {self.assistant_name}" for p in EXIT_PHRASES}:
+            return ["exit"]
+
+        action = AUTOMATION_PHRASES.get(text)
+        if action:
+            return [f"automation {action}"]
+
+        for pattern, template in VALUE_PATTERNS:
+            match = pattern.match(text)
+            if match:
+                if int(match.group(1)) > MAX_LEVEL:
+                    return None
+                return ["automation " + template.format(*match.groups())]
+
+        # Everything below takes a free-form target, so be strict about it
+        if "," in raw or COMPOUND_MARKERS.search(text):
+            return None
+
+        match = re.match(r"^switch to (?:the )?(.+?)( tab)?$", text)
+        if match:
+            target = match.group(1).strip()
+            if target in CHROME_TAB_TARGETS or (match.group(2) and SIMPLE_TARGET.match(target)
+                                                and not set(target.split()) & RELATIVE_WORDS):
+                return [f"automation switch_chrome_tab {target}"]
+            if target in APP_TARGETS:
+                return [f"automation switch_apps {target}"]
+            return None
+
+        match = re.match(r"^minimize (.+)$", text)
+        if match and match.group(1) in APP_TARGETS:
+            return [f"automation minimize_active_window {match.group(1)}"]
+
+        match = re.match(r"^(?:search (?:for )?(.+) on youtube|youtube search (.+)|play (.+) on youtube)$", text)
+        if match:
+            return [f"youtube search {next(g for g in match.groups() if g)}"]
+
+        match = re.match(r"^(?:search (?:for )?(.+) on google|(?:google search|search google for) (.+))$", text)
+        if match:
+            return [f"google search {next(g for g in match.groups() if g)}"]
+
+        match = re.match(r"^(?:generate|create|make) (?:an |a )?image (?:of )?(.+)$", text)
+        if match:
+            return [f"generate image {match.group(1)}"]
+
+        if QUESTION_MARKERS.search(text):
+            return None
+
+        match = re.match(r"^(open|launch|close) (?:the )?(.+)$", text)
+        if match and match.group(2) in OPEN_TARGETS:
+            verb = "close" if match.group(1) == "close" else "open"
+            return [f"{verb} {match.group(2)}"]
+
+        match = re.match(r"^play (?:the )?song (.+)$", text)
+        if match:
+            return [f"youtube search {match.group(1)}"]
+
+        return None
+
+    def _resolve(self, query: str) -> Optional[List[str]]:
+        tasks = self._match(query)
+        if tasks and not all(self._allowed(task) for task in tasks):
+            return None
+        return tasks
+
+    def classify(self, query: str) -> Optional[List[str]]:
+        """Return the task list for a confident match, or None to defer to the LLM."""
+        started = time.perf_counter()
+        tasks = self._resolve(query)
+
+        with self._lock:
+            self.time_spent += time.perf_counter() - started
+            if tasks:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return tasks
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "average_us": round(self.time_spent / total * 1e6, 1) if total else 0.0,
+            }
+
+    def evaluate(self, corpus=LABELLED_CORPUS) -> dict:
+        """Run the classifier over a labelled corpus and report accuracy; live stats are left alone."""
+        wrong = []
+        resolved = 0
+        for query, expected in corpus:
+            got = self._resolve(query)
+            if got is not None:
+                resolved += 1
+            if got != expected:
+                wrong.append((query, expected, got))
+        return {
+            "total": len(corpus),
+            "resolved_locally": resolved,
+            "correct": len(corpus) - len(wrong),
+            "wrong": wrong,
+        }
+
+
+if __name__ == "__main__":
+    funcs = [
+        "exit", "general", "realtime", "open", "close", "play",
+        "generate image", "system", "content", "google search",
+        "youtube search", "reminder", "automation"
+    ]
+    classifier = FastIntentClassifier(funcs, assistant_name="Omnis")
+    report = classifier.evaluate()
+    print(f"Corpus: {report['correct']}/{report['total']} correct, "
+          f"{report['resolved_locally']} resolved without the LLM")
+    for query, expected, got in report["wrong"]:
+        print(f"  ✗ {query!r}: expected {expected}, got {got}")
+    assert classifier.get_stats()["hits"] + classifier.get_stats()["misses"] == 0
+    for query, _ in LABELLED_CORPUS:
+        classifier.classify(query)
+    print(classifier.get_stats())
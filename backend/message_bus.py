@@ -0,0 +1,66 @@
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+# Topics shared by main.py and the GUI
+MIC = "mic"          # GUI → assistant: "True" / "False"
+QUERY = "query"      # GUI → assistant: typed query
+STATUS = "status"    # assistant → GUI: status line
+CHAT = "chat"        # assistant → GUI: one new chat line ("User: ...")
+
+
+class MessageBus:
+    """In-process publish/subscribe bus between the assistant loop and the GUI.
+
+    Replaces the Frontend/Files/*.data polling when both run in one process.
+    `publish` keeps the latest value of each topic and calls subscribers on
+    the publishing thread, so a Qt subscriber must re-emit through a signal.
+    Typed queries are queued rather than overwritten, so none are lost and
+    there is no read-then-truncate race.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._latest: Dict[str, str] = {}
+        self._subscribers: Dict[str, List[Callable[[str], None]]] = {}
+        self._queries = deque()
+
+    def subscribe(self, topic: str, callback: Callable[[str], None]):
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(callback)
+
+    def publish(self, topic: str, payload: str):
+        with self._lock:
+            self._latest[topic] = payload
+            if topic == QUERY:
+                self._queries.append(payload)
+            callbacks = list(self._subscribers.get(topic, ()))
+            self._changed.notify_all()
+
+        for callback in callbacks:
+            try:
+                callback(payload)
+            except Exception as e:
+                print(f"[ERROR] Bus subscriber for '{topic}' failed: {e}")
+
+    def latest(self, topic: str, default: str = "") -> str:
+        with self._lock:
+            return self._latest.get(topic, default)
+
+    def get_query(self) -> Optional[str]:
+        """Next typed query, or None. Never blocks."""
+        with self._lock:
+            return self._queries.popleft() if self._queries else None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until anything is published (or `wake` is called). Returns False on timeout."""
+        with self._lock:
+            if self._queries:
+                return True
+            return self._changed.wait(timeout)
+
+    def wake(self):
+        """Release threads blocked in `wait` without publishing anything."""
+        with self._lock:
+            self._changed.notify_all()
@@ -1,8 +1,20 @@
 import os
+import time
+import threading
+import httpx
 import cohere
 from rich import print
 from dotenv import dotenv_values
 
+try:
+    from .intent_classifier import FastIntentClassifier
+    from .ttl_cache import TTLCache, normalize_query
+except ImportError:
+    from intent_classifier import FastIntentClassifier
+    from ttl_cache import TTLCache, normalize_query
+
+COHERE_BASE_URL = "https://api.cohere.com"
+
 class ModelModule:
     def __init__(self):
 
@@ -26,13 +38,25 @@ class ModelModule:
             raise ValueError("❌ No Cohere API Key found. Put COHERE_API_KEY in .env")
 
         # ---------- Init Cohere client ----------
+        # One pooled HTTP client for the lifetime of the process so the TLS
+        # connection to Cohere stays open between utterances.
+        self.http_client = httpx.Client(
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=300.0),
+        )
         try:
-            self.co = cohere.Client(api_key=self.COHERE_API_KEY)
+            self.co = cohere.Client(api_key=self.COHERE_API_KEY, httpx_client=self.http_client)
             print("[info] Cohere client initialized successfully")
         except Exception as e:
             print("[error] Failed to initialize Cohere client:", e)
             raise
 
+        # ---------- Call statistics ----------
+        self._stats_lock = threading.Lock()
+        self.call_count = 0
+        self.total_latency = 0.0
+        self.last_latency = 0.0
+
 
         self.funcs = [
             "exit", "general", "realtime", "open", "close", "play",
@@ -40,7 +64,16 @@ class ModelModule:
             "youtube search", "reminder", "automation"
         ]
 
-        self.messages = []
+        # Deterministic commands are resolved locally before calling Cohere
+        self.fast_classifier = FastIntentClassifier(self.funcs, assistant_name=self.Assistantname)
+
+        # ---------- Classification cache ----------
+        self.cache_persist = str(self.env.get("DMM_CACHE_PERSIST", "True")).lower() == "true"
+        self.cache = TTLCache(
+            max_size=int(self.env.get("DMM_CACHE_SIZE", 512)),
+            ttl=float(self.env.get("DMM_CACHE_TTL", 24 * 3600)),
+            path=os.path.join(self.BASE_DIR, "data", "DecisionCache.json") if self.cache_persist else None,
+        )
 
         self.preamble = """
             You are a very accurate Decision-Making Model, which decides what kind of a query is given to you.
@@ -103,9 +136,91 @@ class ModelModule:
         # If not found, return the directory containing this script
         return os.path.dirname(os.path.abspath(__file__))
 
-    def FirstLayerDMM(self, prompt: str = "test"):
-        self.messages.append({"role": "user", "content": prompt})
+    def warm_up(self, background: bool = True):
+        """Open the connection to Cohere ahead of the first query."""
+        def _connect():
+            try:
+                self.http_client.head(COHERE_BASE_URL)
+                print("[info] Cohere connection warmed up")
+            except Exception as e:
+                print(f"[warning] Cohere warm-up failed: {e}")
+
+        if background:
+            threading.Thread(target=_connect, daemon=True).start()
+        else:
+            _connect()
+
+    def _record_latency(self, started: float):
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self.call_count += 1
+            self.total_latency += elapsed
+            self.last_latency = elapsed
+        print(f"[info] FirstLayerDMM took {elapsed * 1000:.0f} ms")
+
+    def get_stats(self) -> dict:
+        """Return call count and latency figures for FirstLayerDMM."""
+        with self._stats_lock:
+            average = self.total_latency / self.call_count if self.call_count else 0.0
+            stats = {
+                "calls": self.call_count,
+                "last_ms": round(self.last_latency * 1000, 1),
+                "average_ms": round(average * 1000, 1),
+            }
+        stats["fast_path"] = self.fast_classifier.get_stats()
+        stats["cache"] = self.cache.stats()
+        return stats
+
+    def close(self):
+        try:
+            self.http_client.close()
+        except Exception:
+            pass
 
+    def FirstLayerDMM(self, prompt: str = "test"):
+        return list(self.FirstLayerDMMStream(prompt))
+
+    def FirstLayerDMMStream(self, prompt: str = "test"):
+        """Yield each task as soon as it is known, while the model is still generating."""
+        local = self.fast_classifier.classify(prompt)
+        if local is not None:
+            print(f"[info] FirstLayerDMM resolved locally: {local}")
+            yield from local
+            return
+
+        key = normalize_query(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            print(f"[info] FirstLayerDMM cache hit: {cached}")
+            yield from list(cached)
+            return
+
+        tasks = []
+        parser = TaskStreamParser(self.funcs)
+        started = time.perf_counter()
+        try:
+            for task in self._classify_stream(prompt, parser):
+                tasks.append(task)
+                yield task
+        finally:
+            self._record_latency(started)
+
+        # As before streaming: no usable task, or an unfilled "(query)"
+        # template, sends the whole prompt to the chatbot. Tasks dispatched
+        # ahead of a placeholder can't be taken back; the rest are dropped.
+        if parser.invalid:
+            print("[warning] FirstLayerDMM replied with a placeholder, falling back to general")
+            yield "general " + prompt
+            return   # not cached, so the next ask is classified again
+        if not tasks:
+            tasks = ["general " + prompt]
+            yield tasks[0]
+
+        self.cache.set(key, tasks)
+        if self.cache_persist:
+            self.cache.save()
+
+    def _classify_stream(self, prompt: str, parser: "TaskStreamParser"):
         # ✅ Use chat_stream with 'message' instead of 'messages'
         stream = self.co.chat_stream(
             model="command-a-03-2025",
@@ -115,30 +230,76 @@ class ModelModule:
             # chat_history is NOT supported like before
         )
 
-        response = ""
-
         for event in stream:
             if event.event_type == "text-generation":
-                response += event.text
+                yield from parser.feed(event.text)
             elif event.event_type == "stream-end":
                 break  # ✅ stop streaming when done
 
-        response = response.replace("\n", "")
-        response = [i.strip() for i in response.split(",")]
+        yield from parser.close()
 
-        # filter only known funcs
-        response = [task for task in response if any(task.startswith(func) for func in self.funcs)]
 
-        if not response or "(query)" in "".join(response):
-            return ["general " + prompt]
-        return response
+class TaskStreamParser:
+    """Split streamed model output into tasks at each comma.
+
+    A known task holding the unfilled "(query)" template marks the whole
+    reply invalid; nothing after it is returned.
+    """
+
+    def __init__(self, funcs):
+        self.funcs = funcs
+        self.buffer = ""
+        self.invalid = False
+
+    def _accept(self, part: str):
+        task = part.strip()
+        # filter only known funcs
+        if self.invalid or not task or not any(task.startswith(func) for func in self.funcs):
+            return None
+        if "(query)" in task:
+            self.invalid = True
+            return None
+        return task
+
+    def feed(self, text: str):
+        """Add streamed text and return the tasks completed by it."""
+        self.buffer += text.replace("\n", "")
+        tasks = []
+        while "," in self.buffer:
+            part, self.buffer = self.buffer.split(",", 1)
+            task = self._accept(part)
+            if task:
+                tasks.append(task)
+        return tasks
+
+    def close(self):
+        """Return the final task once the stream has ended."""
+        task = self._accept(self.buffer)
+        self.buffer = ""
+        return [task] if task else []
+
+
+# Process-wide instance, shared by every caller
+_model_module = None
+_model_module_lock = threading.Lock()
+
+def get_model_module():
+    """Get or create the shared decision model."""
+    global _model_module
+    if _model_module is None:
+        with _model_module_lock:
+            if _model_module is None:
+                _model_module = ModelModule()
+                _model_module.warm_up()
+    return _model_module
 
 
 if __name__ == "__main__":
-    model = ModelModule()
+    model = get_model_module()
     while True:
         user_input = input(">>> ")
         print(model.FirstLayerDMM(user_input))
+        print(model.get_stats())
         
         
         
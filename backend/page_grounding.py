@@ -0,0 +1,220 @@
+import re
+import math
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Union
+
+from bs4 import BeautifulSoup
+
+try:
+    from .context_builder import TokenCounter
+    from .web_search import HTML_PARSER, make_session
+except ImportError:
+    from context_builder import TokenCounter
+    from web_search import HTML_PARSER, make_session
+
+# Page chrome that never holds the answer
+BOILERPLATE_TAGS = ["script", "style", "noscript", "template", "svg", "nav", "header", "footer",
+                    "aside", "form", "iframe", "button"]
+TEXT_TAGS = ["p", "li", "h1", "h2", "h3", "h4", "blockquote", "pre", "td", "dd"]
+
+STOP_WORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "of", "in", "on", "at", "to", "for",
+    "from", "by", "with", "and", "or", "as", "it", "its", "this", "that", "what", "who", "whom",
+    "which", "how", "when", "where", "why", "do", "does", "did", "tell", "me", "about", "i", "you",
+}
+
+
+def stem(word: str) -> str:
+    """Crude suffix strip so "close", "closed" and "closes" meet"""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            word = word[:-len(suffix)]
+            break
+    return word[:-1] if len(word) > 3 and word.endswith("e") else word
+
+
+def terms(text: str) -> List[str]:
+    return [stem(word) for word in re.findall(r"\w+", text.lower()) if word not in STOP_WORDS]
+
+
+def extract_main_text(html: Union[str, bytes]) -> List[str]:
+    """Readable blocks of a page: <article>/<main> if there is one, minus navigation and scripts.
+    Bytes are decoded by BeautifulSoup from <meta charset> or by sniffing."""
+    soup = BeautifulSoup(html, HTML_PARSER)
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    root = soup.find("article") or soup.find("main") or soup.body or soup
+
+    blocks = []
+    for element in root.find_all(TEXT_TAGS):
+        # A <li> or <td> wrapping <p>s would repeat their text
+        if element.find(TEXT_TAGS):
+            continue
+        text = " ".join(element.get_text(" ", strip=True).split())
+        if len(text) >= 30 or element.name.startswith("h"):
+            blocks.append(text)
+    return blocks
+
+
+def split_passages(blocks: List[str], max_words: int = 80, min_words: int = 12) -> List[str]:
+    """Group consecutive blocks into passages of up to max_words, splitting long blocks at sentences"""
+    sentences = []
+    for block in blocks:
+        words = block.split()
+        if len(words) <= max_words:
+            sentences.append(block)
+        else:
+            sentences.extend(re.split(r"(?<=[.!?])\s+", block))
+
+    passages, current, count = [], [], 0
+    for sentence in sentences:
+        length = len(sentence.split())
+        if current and count + length > max_words:
+            passages.append(" ".join(current))
+            current, count = [], 0
+        current.append(sentence)
+        count += length
+    if current:
+        passages.append(" ".join(current))
+    return [passage for passage in passages if len(passage.split()) >= min_words]
+
+
+class BM25:
+    """Okapi BM25 over a small in-memory set of passages"""
+
+    def __init__(self, documents: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs = [Counter(terms(document)) for document in documents]
+        self.lengths = [sum(doc.values()) for doc in self.docs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.docs else 0.0
+        self.df = Counter(term for doc in self.docs for term in doc)
+
+    def idf(self, term: str) -> float:
+        n = len(self.docs)
+        df = self.df.get(term, 0)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def scores(self, query: str) -> List[float]:
+        query_terms = set(terms(query))
+        idf = {term: self.idf(term) for term in query_terms}
+        results = []
+        for doc, length in zip(self.docs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1))
+            results.append(sum(idf[term] * doc[term] * (self.k1 + 1) / (doc[term] + norm)
+                               for term in query_terms if term in doc))
+        return results
+
+
+class PageGrounder:
+    """Turns search results into the passages that best answer the query.
+
+    The top `max_pages` result pages are fetched concurrently over a bounded
+    pool, each with its own timeout. Their main text is split into passages,
+    which are ranked together with the original snippets by BM25 against the
+    query. The best passages are returned, in the {title, snippet, url}
+    shape of a search result, until `token_budget` is spent. With no budget
+    given, the passages get as many tokens as the snippets they replace, so
+    grounding improves the context without growing the prompt. Pages that
+    are slow, fail, or aren't HTML simply contribute nothing.
+    """
+
+    def __init__(self, max_pages: int = 4, page_timeout: float = 2.0, token_budget: Optional[int] = None,
+                 max_passages: int = 8, max_bytes: int = 1_500_000, session=None, counter: TokenCounter = None):
+        self.max_pages = max_pages
+        self.page_timeout = page_timeout
+        self.token_budget = token_budget
+        self.max_passages = max_passages
+        self.max_bytes = max_bytes
+        self.session = session or make_session(pool_size=max_pages)
+        self.counter = counter or TokenCounter()
+        self._executor = ThreadPoolExecutor(max_workers=max_pages, thread_name_prefix="page")
+
+    def fetch_text(self, url: str) -> List[str]:
+        """Main-text blocks of one page; [] if it isn't HTML or can't be fetched in time"""
+        response = self.session.get(url, timeout=self.page_timeout, stream=True)
+        try:
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "html")
+            if "html" not in content_type:
+                return []
+            body = b""
+            for chunk in response.iter_content(64 * 1024):
+                body += chunk
+                if len(body) >= self.max_bytes:
+                    break
+            if "charset=" not in content_type.lower():
+                # requests would assume ISO-8859-1 for text/html without a charset
+                return extract_main_text(body)
+            return extract_main_text(body.decode(response.encoding or "utf-8", errors="replace"))
+        finally:
+            response.close()
+
+    def ground(self, query: str, results: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        started = time.perf_counter()
+        pages = [result for result in results if result.get("url", "").startswith("http")][:self.max_pages]
+        futures = {self._executor.submit(self.fetch_text, result["url"]): result for result in pages}
+        # Each request has its own timeout; this bounds the stage as a whole
+        done, not_done = wait(futures, timeout=self.page_timeout + 0.5)
+
+        candidates = []   # (passage, source result)
+        for result in results:
+            if result.get("snippet") and result["snippet"] != "No snippet":
+                candidates.append((result["snippet"], result))
+        fetched = 0
+        for future in futures:   # in result order, so ties favour higher-ranked pages
+            if future not in done:
+                continue
+            try:
+                blocks = future.result()
+            except Exception as e:
+                print(f"[warning] Page fetch failed for {futures[future].get('url')}: {e}")
+                continue
+            passages = split_passages(blocks)
+            fetched += bool(passages)
+            candidates.extend((passage, futures[future]) for passage in passages)
+
+        selected = self.select(query, candidates, self.token_budget or self.snippet_tokens(results))
+        print(f"[info] Grounding: {fetched}/{len(pages)} page(s), {len(candidates)} passage(s) ranked, "
+              f"{len(selected)} kept in {time.perf_counter() - started:.2f}s"
+              f"{f' ({len(not_done)} page(s) too slow)' if not_done else ''}")
+        return selected or results
+
+    def snippet_tokens(self, results: List[Dict[str, str]]) -> int:
+        """What the search results alone would cost in the prompt"""
+        return sum(self.counter.count(result.get("title", "")) + self.counter.count(result.get("snippet", ""))
+                   for result in results)
+
+    def select(self, query: str, candidates, budget: Optional[int] = None) -> List[Dict[str, str]]:
+        """Best-scoring passages within the token budget, highest first"""
+        budget = budget or self.token_budget or 0
+        if not candidates:
+            return []
+        scores = BM25([passage for passage, _ in candidates]).scores(query)
+        ranked = sorted(zip(scores, range(len(candidates))), key=lambda item: (-item[0], item[1]))
+
+        selected, seen, spent = [], set(), 0
+        for score, index in ranked:
+            if score <= 0:
+                break
+            passage, result = candidates[index]
+            key = " ".join(terms(passage))[:200]
+            if key in seen:
+                continue
+            tokens = self.counter.count(passage) + self.counter.count(result.get("title", ""))
+            if spent + tokens > budget:
+                continue
+            seen.add(key)
+            spent += tokens
+            selected.append({"title": result.get("title", "No title"), "snippet": passage,
+                             "url": result.get("url", ""), "source": result.get("source", ""),
+                             "score": round(score, 3)})
+            if len(selected) >= self.max_passages:
+                break
+        return selected
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
@@ -1,17 +1,26 @@
 # realtime-search.py
 import os
-import json
 import time
 import datetime
 import traceback
 from dotenv import dotenv_values
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from groq import Groq
 
+try:
+    from .conversation_store import get_conversation_store
+    from .web_search import (BingBrowser, BingHttpSearch, DuckDuckGoHttpSearch, WikipediaSearch, MultiSourceSearch,
+                             make_session, search_category, BING_BASE_URL, DUCKDUCKGO_BASE_URL,
+                             WIKIPEDIA_BASE_URL, SEARCH_TTLS)
+    from .ttl_cache import TTLCache, normalize_query
+    from .page_grounding import PageGrounder
+except ImportError:
+    from conversation_store import get_conversation_store
+    from web_search import (BingBrowser, BingHttpSearch, DuckDuckGoHttpSearch, WikipediaSearch, MultiSourceSearch,
+                            make_session, search_category, BING_BASE_URL, DUCKDUCKGO_BASE_URL,
+                            WIKIPEDIA_BASE_URL, SEARCH_TTLS)
+    from ttl_cache import TTLCache, normalize_query
+    from page_grounding import PageGrounder
+
 class RealtimeSearchModule:
     def __init__(self):
         # ---------- Find project root (omnis.ai) ----------
@@ -34,11 +43,65 @@ class RealtimeSearchModule:
             print("[error] Failed to initialize Groq client:", e)
             raise
 
-        # ---------- Data folder & chatlog ----------
+        # ---------- Data folder & conversation store ----------
         self.data_dir = os.path.join(self.BASE_DIR, "data")
         os.makedirs(self.data_dir, exist_ok=True)
-        self.chatlog_path = os.path.join(self.data_dir, "ChatLog.json")
-        self.messages = self._load_chatlog()
+        self.store = get_conversation_store(self.data_dir)
+
+        # ---------- Search backends ----------
+        # All HTTP sources are queried at once; a Selenium Chrome is only started if none answer
+        self.search_backend = str(self.env.get("SEARCH_BACKEND", "http")).lower()
+        bing_base_url = self.env.get("BING_BASE_URL", BING_BASE_URL)
+        search_timeout = float(self.env.get("SEARCH_TIMEOUT", 5.0))
+        self.http_session = make_session()
+        available_sources = {
+            "bing": lambda: BingHttpSearch(bing_base_url, search_timeout, session=self.http_session),
+            "duckduckgo": lambda: DuckDuckGoHttpSearch(self.env.get("DUCKDUCKGO_BASE_URL", DUCKDUCKGO_BASE_URL),
+                                                       search_timeout, session=self.http_session),
+            "wikipedia": lambda: WikipediaSearch(self.env.get("WIKIPEDIA_BASE_URL", WIKIPEDIA_BASE_URL),
+                                                 search_timeout, session=self.http_session),
+        }
+        source_names = [name.strip().lower() for name in
+                        str(self.env.get("SEARCH_SOURCES", "bing,duckduckgo,wikipedia")).split(",")]
+        self.multi_search = MultiSourceSearch(
+            {name: available_sources[name]().search for name in source_names if name in available_sources},
+            budget=float(self.env.get("SEARCH_BUDGET", 2.5)),
+            enough=int(self.env.get("SEARCH_ENOUGH", 0)) or None,
+        )
+        # The fallback browser is started once and reused, never per query
+        self.browser = None
+        self.browser_options = {
+            "base_url": bing_base_url,
+            "timeout": float(self.env.get("SEARCH_BROWSER_TIMEOUT", 10.0)),
+            "max_queries": int(self.env.get("SEARCH_BROWSER_MAX_QUERIES", 50)),
+            "max_memory_mb": int(self.env.get("SEARCH_BROWSER_MAX_MB", 800)),
+        }
+        if self.search_backend == "selenium":
+            self.browser = BingBrowser(**self.browser_options)
+            self.browser.warm_up()
+
+        # ---------- Page grounding ----------
+        # Fetch the top result pages and keep the passages that best match the query.
+        # Opt-in: it adds up to SEARCH_PAGE_TIMEOUT to every realtime answer.
+        # SEARCH_CONTEXT_TOKENS=0 spends what the snippets would have.
+        self.grounder = None
+        if str(self.env.get("SEARCH_PAGES", "False")).lower() == "true":
+            self.grounder = PageGrounder(
+                max_pages=int(self.env.get("SEARCH_PAGES_MAX", 4)),
+                page_timeout=float(self.env.get("SEARCH_PAGE_TIMEOUT", 2.0)),
+                token_budget=int(self.env.get("SEARCH_CONTEXT_TOKENS", 0)) or None,
+            )
+
+        # ---------- Search result cache ----------
+        # Repeated questions within a category's TTL skip scraping entirely
+        self.search_ttls = {category: float(self.env.get(f"SEARCH_TTL_{category.upper()}", ttl))
+                            for category, ttl in SEARCH_TTLS.items()}
+        self.search_cache_persist = str(self.env.get("SEARCH_CACHE_PERSIST", "True")).lower() == "true"
+        self.search_cache = TTLCache(
+            max_size=int(self.env.get("SEARCH_CACHE_SIZE", 256)),
+            ttl=self.search_ttls["factual"],
+            path=os.path.join(self.data_dir, "SearchCache.json") if self.search_cache_persist else None,
+        )
 
         # ---------- System message ----------
         self.system_message = (
@@ -67,89 +130,39 @@ class RealtimeSearchModule:
             path = parent
         return os.path.abspath(os.path.join(start, ".."))
 
-    def _load_chatlog(self):
-        if os.path.exists(self.chatlog_path):
+    def search(self, query, num_results=5):
+        """Search every configured source at once and return list of dicts {title, snippet, url, source}"""
+        if self.search_backend != "selenium":
             try:
-                with open(self.chatlog_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception:
-                print("[warning] Failed to parse chat log; starting fresh.")
-                traceback.print_exc()
-                try:
-                    os.rename(self.chatlog_path, self.chatlog_path + ".broken")
-                except Exception:
-                    pass
-        return []
-
-    def bing_search(self, query, num_results=5):
-        """Scrape Bing and return list of dicts {title, snippet}"""
-        results_data = []
-        chrome_options = Options()
-        
-        # Keep Chrome in background without headless mode
-        chrome_options.add_argument("--disable-popup-blocking")
-        chrome_options.add_argument("--disable-notifications")
-        chrome_options.add_argument("--disable-infobars")
-        chrome_options.add_argument("--disable-extensions")
-        chrome_options.add_argument("--no-first-run")
-        chrome_options.add_argument("--no-default-browser-check")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        
-        # Minimize window and prevent focus stealing
-        chrome_options.add_argument("--window-position=-2400,-2400")  # Move window off-screen
-        chrome_options.add_argument("--window-size=800,600")
-        chrome_options.add_experimental_option("useAutomationExtension", False)
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
-        
-        # Additional options to prevent focus
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--log-level=3")
-        
-        service = Service()
-        driver = None
-
+                results = self.multi_search.search(query, num_results)
+                if results:
+                    return results
+                print("[warning] No search source answered in time, falling back to Selenium")
+            except Exception as e:
+                print(f"[warning] HTTP search failed ({e}), falling back to Selenium")
+        return self._bing_search_selenium(query, num_results)
+
+    def _bing_search_selenium(self, query, num_results=5):
+        """Search Bing in the warm headless Chrome and return list of dicts {title, snippet}"""
         try:
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            # Minimize the window immediately after creation (backup method)
-            try:
-                driver.minimize_window()
-            except:
-                pass
-            
-            driver.get("https://www.bing.com")
-            time.sleep(1.5)
-
-            search_box = driver.find_element(By.NAME, "q")
-            search_box.clear()
-            search_box.send_keys(query)
-            search_box.send_keys(Keys.RETURN)
-            time.sleep(2)
-
-            results = driver.find_elements(By.CSS_SELECTOR, "li.b_algo")
-            for result in results[:num_results]:
-                try:
-                    title = result.find_element(By.TAG_NAME, "h2").text
-                except:
-                    title = "No title"
-                try:
-                    snippet = result.find_element(By.CSS_SELECTOR, "p").text.strip()
-                except:
-                    snippet = "No snippet"
-                results_data.append({"title": title, "snippet": snippet})
-
+            if self.browser is None:
+                self.browser = BingBrowser(**self.browser_options)
+            started = time.perf_counter()
+            results = self.browser.search(query, num_results)
+            print(f"[info] Bing browser search: {len(results)} result(s) in {time.perf_counter() - started:.2f}s")
+            return results
         except Exception as e:
             print("[error] Bing scraping failed:", e)
             traceback.print_exc()
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
+            return []
 
-        return results_data
+    def close(self):
+        self.multi_search.close()
+        self.http_session.close()
+        if self.grounder is not None:
+            self.grounder.close()
+        if self.browser is not None:
+            self.browser.close()
 
     def get_datetime_info(self):
         now = datetime.datetime.now()
@@ -192,20 +205,38 @@ class RealtimeSearchModule:
             return "⚠️ Failed to get answer from Groq."
 
         # Save chat
-        self.messages.append({"role": "user", "content": query})
-        self.messages.append({"role": "assistant", "content": answer})
         try:
-            with open(self.chatlog_path, "w", encoding="utf-8") as f:
-                json.dump(self.messages, f, indent=4, ensure_ascii=False)
+            self.store.append_many(
+                [{"role": "user", "content": query}, {"role": "assistant", "content": answer}],
+                source="realtime",
+            )
         except Exception as e:
             print("[warning] Failed to save chat log:", e)
             traceback.print_exc()
 
         return answer
 
+    def cached_search(self, query, num_results=5):
+        """search (and page grounding) behind the TTL cache; only non-empty results are cached"""
+        key = f"{normalize_query(query)}|{num_results}"
+        cached = self.search_cache.get(key)
+        if cached is not None:
+            print(f"[info] Search cache hit; hit rate {self.search_cache.stats()['hit_rate']}")
+            return cached
+
+        results = self.search(query, num_results)
+        if results and self.grounder is not None:
+            results = self.grounder.ground(query, results)
+        if results:
+            category = search_category(normalize_query(query))
+            self.search_cache.set(key, results, ttl=self.search_ttls[category])
+            if self.search_cache_persist:
+                self.search_cache.save()
+        return results
+
     def realtime_query(self, query, num_results=5):
         print(f"[info] Searching for: {query}")
-        scraped = self.bing_search(query, num_results)
+        scraped = self.cached_search(query, num_results)
         print(f"[info] Retrieved {len(scraped)} result(s).")
         return self.ask_groq(query, scraped)
 
@@ -231,6 +262,7 @@ if __name__ == "__main__":
             print("\n" + "="*60)
         except KeyboardInterrupt:
             print("\nExiting.")
+            engine.close()
             break
         except Exception as e:
             print("[error] Unexpected error while handling query:", e)
@@ -0,0 +1,300 @@
+import os
+import json
+import math
+import time
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Tuple
+
+try:
+    from .ttl_cache import normalize_query
+except ImportError:
+    from ttl_cache import normalize_query
+
+# Words that carry no meaning for matching one question against another
+STOP_WORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "am", "do", "does", "did",
+    "what", "whats", "who", "whos", "which", "how", "hows", "why", "where", "wheres", "when",
+    "can", "could", "would", "will", "should", "shall", "may", "might", "must",
+    "i", "you", "your", "yours", "we", "us", "our", "me",
+    "of", "in", "on", "at", "to", "for", "from", "by", "with", "about", "as", "into", "and", "or",
+    "tell", "explain", "describe", "define", "give", "please", "some", "any", "kind", "mean", "meaning",
+}
+
+# A category noun phrase after the subject adds nothing: "python programming language" asks about python.
+# Only at the end of the question, so "the language of brazil" keeps its meaning.
+GENERIC_TAILS = [
+    ("programming", "language"), ("coding", "language"), ("scripting", "language"),
+    ("web", "framework"), ("software", "library"),
+]
+
+# Asks for something new each time; a stored answer would repeat the same joke or poem
+CREATIVE_WORDS = {
+    "joke", "jokes", "poem", "poems", "story", "stories", "song", "songs", "lyrics", "rap", "haiku",
+    "riddle", "riddles", "write", "compose", "create", "generate", "imagine", "invent", "random",
+    "surprise", "suggest", "recommend", "pick", "quote",
+}
+
+# Answers to these change over time, so they are never cached
+TIME_WORDS = {
+    "time", "date", "day", "today", "tonight", "tomorrow", "yesterday", "now", "current", "currently",
+    "latest", "recent", "recently", "news", "weather", "week", "month", "year", "clock", "oclock",
+    "morning", "evening", "afternoon", "remind", "reminder", "schedule",
+}
+
+# Answers to these depend on what was said before
+CONVERSATION_WORDS = {
+    "he", "she", "him", "her", "his", "hers", "they", "them", "their", "theirs", "it", "its",
+    "this", "that", "these", "those", "there", "my", "mine", "myself",
+    "again", "more", "previous", "earlier", "before", "above", "said", "last", "else", "another",
+    "continue", "same", "thanks", "thank", "yes", "no", "ok", "okay",
+}
+
+
+def tokenize(query: str):
+    """Content words of a normalized query in order, with a crude plural strip"""
+    tokens = []
+    for word in normalize_query(query).split():
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    for tail in GENERIC_TAILS:
+        if len(tokens) > len(tail) and tuple(tokens[-len(tail):]) == tail:
+            del tokens[-len(tail):]
+            break
+    return tokens
+
+
+def features(query: str) -> Counter:
+    """Content words plus adjacent word pairs, so word order counts:
+    "celsius to fahrenheit" and "fahrenheit to celsius" share no pair"""
+    tokens = tokenize(query)
+    return Counter(tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])])
+
+
+class SemanticResponseCache:
+    """Answers to general questions, looked up by TF-IDF cosine similarity.
+
+    A question is served from the cache when its TF-IDF vector is at least
+    `threshold` similar to a stored question, so "what is python", "what's
+    python" and "what's the python programming language" share one answer.
+    Only function words and a trailing category phrase are dropped: a content
+    word the other question lacks ("the language of brazil" vs "about
+    brazil") lowers the score below the threshold, and words the cache has
+    never seen weigh the most. Adjacent word pairs are features too, so the
+    same words in another order ("is java faster than python" and the
+    reverse) don't match. Creative asks (jokes, poems) and questions that
+    mention time or refer back to the conversation are bypassed entirely.
+    IDF weights are computed from the cached questions themselves; an
+    inverted index limits scoring to entries that share a word with the
+    query. Eviction is LRU with an optional time-to-live.
+    """
+
+    def __init__(self, max_size: int = 256, threshold: float = 0.8, ttl: float = 7 * 24 * 3600,
+                 path: str = None):
+        self.max_size = max(1, int(max_size))
+        self.threshold = float(threshold)
+        self.ttl = float(ttl)
+        self.path = path
+
+        self._entries = OrderedDict()   # normalized query -> (expires_at, term counts, answer)
+        self._postings: Dict[str, set] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+        if self.path:
+            self.load()
+
+    @staticmethod
+    def cacheable(query: str) -> bool:
+        words = set(normalize_query(query).split())
+        return bool(tokenize(query)) and not (words & (TIME_WORDS | CONVERSATION_WORDS | CREATIVE_WORDS))
+
+    # ---------- Lookup ----------
+
+    def get(self, query: str) -> Optional[Tuple[str, float]]:
+        """(answer, similarity) of the closest stored question, or None"""
+        if not self.cacheable(query):
+            with self._lock:
+                self.bypassed += 1
+            return None
+
+        terms = features(query)
+        now = time.time()
+        with self._lock:
+            best_key, best_score = None, 0.0
+            query_vector = self._vector(terms)
+            for key in self._candidates(terms):
+                expires_at, entry_terms, _ = self._entries[key]
+                if expires_at <= now:
+                    continue
+                score = self._cosine(query_vector, self._vector(entry_terms))
+                if score > best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None or best_score < self.threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            return self._entries[best_key][2], best_score
+
+    def _candidates(self, terms: Counter):
+        keys = set()
+        for term in terms:
+            keys |= self._postings.get(term, set())
+        return keys
+
+    def _idf(self, term: str) -> float:
+        # Smoothed, so a word present in every entry still has weight
+        return math.log((1 + len(self._entries)) / (1 + len(self._postings.get(term, ())))) + 1.0
+
+    def _vector(self, terms: Counter) -> Dict[str, float]:
+        vector = {term: count * self._idf(term) for term, count in terms.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {term: w / norm for term, w in vector.items()}
+
+    @staticmethod
+    def _cosine(a: Dict[str, float], b: Dict[str, float]) -> float:
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(w * b.get(term, 0.0) for term, w in a.items())
+
+    # ---------- Updates ----------
+
+    def set(self, query: str, answer: str, ttl: float = None):
+        if not answer or not self.cacheable(query):
+            return
+        key = normalize_query(query)
+        terms = features(query)
+        expires_at = time.time() + (self.ttl if ttl is None else float(ttl))
+        with self._lock:
+            self._remove(key)
+            self._add(key, expires_at, terms, answer)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _add(self, key: str, expires_at: float, terms: Counter, answer: str):
+        self._entries[key] = (expires_at, terms, answer)
+        for term in terms:
+            self._postings.setdefault(term, set()).add(key)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for term in entry[1]:
+            keys = self._postings.get(term)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[term]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._postings.clear()
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (expires_at, _, _) in self._entries.items() if expires_at <= now]:
+                self._remove(key)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    # ---------- Persistence ----------
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except Exception as e:
+            print(f"[warning] Failed to load cache {self.path}: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            for key, expires_at, answer in entries:
+                if expires_at > now:
+                    self._add(key, expires_at, features(key), answer)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def save(self):
+        if not self.path:
+            return
+        self.purge_expired()
+        tmp_path = self.path + ".tmp"
+        with self._lock:
+            entries = [[key, expires_at, answer] for key, (expires_at, _, answer) in self._entries.items()]
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"[warning] Failed to save cache {self.path}: {e}")
+
+
+if __name__ == "__main__":
+    # Which rephrasings share an answer and which must not: python response_cache.py
+    cache = SemanticResponseCache()
+    for question in ["what is python", "convert celsius to fahrenheit", "is java faster than python",
+                     "tell me about brazil", "which is fastest"]:
+        cache.set(question, f"answer to {question!r}")
+
+    hits = [
+        ("what's python", "what is python"),
+        ("tell me about python", "what is python"),
+        ("what's the python programming language", "what is python"),
+        ("Convert Celsius to Fahrenheit?", "convert celsius to fahrenheit"),
+        ("tell me about brazil please", "tell me about brazil"),
+    ]
+    misses = [
+        "convert fahrenheit to celsius",
+        "is python faster than java",
+        "what is the language of brazil",
+        "which programming language is fastest",
+        "what is python used for",
+    ]
+    bypassed = ["tell me a joke", "write a poem about python", "what time is it", "tell me more about it"]
+
+    failures = 0
+    for query, expected in hits:
+        found = cache.get(query)
+        ok = found is not None and found[0] == f"answer to {expected!r}"
+        failures += not ok
+        print(f"{'ok' if ok else 'FAIL'}  hit    {query!r} -> {found}")
+    for query in misses + bypassed:
+        found = cache.get(query)
+        failures += found is not None
+        kind = "bypass" if query in bypassed else "miss"
+        print(f"{'ok' if found is None else 'FAIL'}  {kind:<6} {query!r} -> {found}")
+    for query in bypassed:
+        failures += cache.cacheable(query)
+    print(cache.stats())
+    raise SystemExit(1 if failures else 0)
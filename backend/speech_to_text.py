@@ -41,6 +41,7 @@ class SpeechRecognitionManager:
         self.input_language = "en-US"  # Default
         self.recognition_timeout = 30  # seconds
         self.max_retries = 3
+        self.status_callback = None  # set by the host to receive status without Status.data
         
         # Register cleanup function
         atexit.register(self.cleanup)
@@ -412,6 +413,9 @@ class SpeechRecognitionManager:
     
     def set_assistant_status(self, status: str):
         """Set assistant status safely."""
+        if self.status_callback:
+            self.status_callback(status)
+            return
         try:
             status_file = self.temp_dir_path / "Status.data"
             with open(status_file, "w", encoding='utf-8') as file:
@@ -0,0 +1,116 @@
+import re
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+
+
+def normalize_command(text: str) -> str:
+    """Lowercase, treat underscores as spaces, drop parentheses and extra spaces."""
+    text = text.lower().replace("_", " ")
+    text = re.sub(r"[()]", "", text)
+    return " ".join(text.split())
+
+
+class TaskRouter:
+    """Dispatch table keyed on the leading words of a task.
+
+    A task such as "generate image a lion" is routed by looking up its first
+    few words in a dict, longest prefix first, so routing cost does not grow
+    with the number of registered handlers and a word later in the task
+    ("general what is open source") can never change where it goes.
+    """
+
+    def __init__(self, name: str = "router"):
+        self.name = name
+        self._routes: Dict[str, Callable[[str], None]] = {}
+        self._max_words = 1
+
+    def register(self, prefixes: Union[str, Iterable[str]], handler: Callable[[str], None] = None):
+        """Register a handler for one or more prefixes; usable as a decorator."""
+        if isinstance(prefixes, str):
+            prefixes = [prefixes]
+        prefixes = [normalize_command(p) for p in prefixes]
+
+        def decorator(func):
+            for prefix in prefixes:
+                if prefix in self._routes:
+                    raise ValueError(f"{self.name}: prefix '{prefix}' is already registered")
+                self._routes[prefix] = func
+                self._max_words = max(self._max_words, len(prefix.split()))
+            return func
+
+        if handler is not None:
+            return decorator(handler)
+        return decorator
+
+    def match(self, task: str) -> Optional[Tuple[str, Callable[[str], None], str]]:
+        """Return (prefix, handler, argument) for a task, or None if nothing matches."""
+        words = normalize_command(task).split()
+        for n in range(min(self._max_words, len(words)), 0, -1):
+            prefix = " ".join(words[:n])
+            handler = self._routes.get(prefix)
+            if handler is not None:
+                return prefix, handler, self._argument(task, n)
+        return None
+
+    @staticmethod
+    def _argument(task: str, n_words: int) -> str:
+        """Strip the first n normalized words from the original text, keeping the rest as-is."""
+        tokens = re.sub(r"[()]", "", task).split()
+        consumed = 0
+        for i, token in enumerate(tokens):
+            pieces = token.replace("_", " ").split()
+            if consumed + len(pieces) >= n_words:
+                leftover = pieces[n_words - consumed:]
+                return " ".join(leftover + tokens[i + 1:]).strip()
+            consumed += len(pieces)
+        return ""
+
+    def dispatch(self, task: str) -> bool:
+        """Run the handler for a task. Returns False when no route matches."""
+        matched = self.match(task)
+        if matched is None:
+            return False
+        _, handler, argument = matched
+        handler(argument)
+        return True
+
+    def prefixes(self):
+        return sorted(self._routes)
+
+
+# Ambiguous inputs that the old substring chain routed to the wrong handler
+AMBIGUOUS_TASKS = [
+    ("general what is open source software?", "general", "what is open source software?"),
+    ("general how do I write good content?", "general", "how do I write good content?"),
+    ("general can you close the topic and summarize", "general", "can you close the topic and summarize"),
+    ("realtime open ai latest news", "realtime", "open ai latest news"),
+    ("realtime who won the general election", "realtime", "who won the general election"),
+    ("content email about the open house", "content", "email about the open house"),
+    ("generate image of a general in battle", "generate image", "of a general in battle"),
+    ("google search how to close a bank account", "google search", "how to close a bank account"),
+    ("youtube search open water swimming", "youtube search", "open water swimming"),
+    ("open Control Panel", "open", "Control Panel"),
+    ("close notepad", "close", "notepad"),
+    ("automation scroll_feed_down", "automation", "scroll_feed_down"),
+    ("merolagani Trade Tower Limited", "merolagani", "Trade Tower Limited"),
+    ("automation switch_apps vscode", "automation", "switch_apps vscode"),
+    ("general what does my_variable do", "general", "what does my_variable do"),
+    ("exit", "exit", ""),
+    ("openai is cool", None, None),
+    ("reminder 9pm meeting", None, None),
+]
+
+
+if __name__ == "__main__":
+    router = TaskRouter("tasks")
+    for prefix in ["general", "realtime", "generate image", "google search", "youtube search",
+                   "content", "merolagani", "open", "close", "automation", "exit"]:
+        router.register(prefix, lambda arg: None)
+
+    failures = 0
+    for task, expected_prefix, expected_argument in AMBIGUOUS_TASKS:
+        matched = router.match(task)
+        got = (matched[0], matched[2]) if matched else (None, None)
+        ok = got == (expected_prefix, expected_argument)
+        failures += not ok
+        print(f"{'✓' if ok else '✗'} {task!r} → {got}")
+    print(f"\n{len(AMBIGUOUS_TASKS) - failures}/{len(AMBIGUOUS_TASKS)} routed correctly")
@@ -1,11 +1,22 @@
 
-import pygame
 import random
-import asyncio
-import edge_tts
 import os
+import re
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import dotenv_values
 
+try:
+    from .audio_cache import AudioCache
+    from .audio_output import AudioOutput, AudioStream
+    from .tts_backends import BackendSelector, EdgeTTSBackend, EspeakBackend, PiperBackend, Pyttsx3Backend
+except ImportError:
+    from audio_cache import AudioCache
+    from audio_output import AudioOutput, AudioStream
+    from tts_backends import BackendSelector, EdgeTTSBackend, EspeakBackend, PiperBackend, Pyttsx3Backend
+
 # Get the absolute path of the parent directory (MainFolder)
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 env_path = os.path.join(BASE_DIR, ".env")
@@ -21,59 +32,269 @@ VOICE_MAP = {
 }
 AssistantVoice = VOICE_MAP.get(AssistantGender, "en-GB-RyanNeural")
 
+# Pitch & Rate depending on gender
+if AssistantGender == "Male":
+    VOICE_PITCH = "-2Hz"
+    VOICE_RATE = "+2%"
+else:  # Female
+    VOICE_PITCH = "+4Hz"
+    VOICE_RATE = "+5%"
+
+# Said instead of the rest of a long answer, which stays on the chat screen
+FILLER_RESPONSES = [
+    "The rest of the result has been printed to the chat screen, kindly check it out sir.",
+    "The rest of the text is now on the chat screen, sir, please check it.",
+    "You can see the rest of the text on the chat screen, sir.",
+    "The remaining part of the text is now on the chat screen, sir.",
+    "Sir, you'll find more text on the chat screen for you to see.",
+    "The rest of the answer is now on the chat screen, sir.",
+    "Sir, please look at the chat screen, the rest of the answer is there.",
+    "You'll find the complete answer on the chat screen, sir.",
+    "The next part of the text is on the chat screen, sir.",
+    "Sir, please check the chat screen for more information.",
+    "There's more text on the chat screen for you, sir.",
+    "Sir, take a look at the chat screen for additional text.",
+    "You'll find more to read on the chat screen, sir.",
+    "Sir, check the chat screen for the rest of the text.",
+    "The chat screen has the rest of the text, sir.",
+    "There's more to see on the chat screen, sir, please look.",
+    "Sir, the chat screen holds the continuation of the text.",
+    "You'll find the complete answer on the chat screen, kindly check it out sir.",
+    "Please review the chat screen for the rest of the text, sir.",
+    "Sir, look at the chat screen for the complete answer."
+]
+
+# Speech engines: the online edge_tts voice, and local ones for when it is
+# unreachable or too slow. TTS_BACKEND=edge|piper|pyttsx3|espeak pins one.
+TTS_ENGINE = BackendSelector(
+    [
+        EdgeTTSBackend(AssistantVoice, pitch=VOICE_PITCH, rate=VOICE_RATE),
+        PiperBackend(env_vars.get("PIPER_MODEL")),
+        Pyttsx3Backend(AssistantGender),
+        EspeakBackend("en-gb" if AssistantGender == "Male" else "en-us+f3"),
+    ],
+    preferred=env_vars.get("TTS_BACKEND", "auto"),
+    latency_budget=float(env_vars.get("TTS_LATENCY_BUDGET", 1.5)),
+)
+
+# Set once "no speech engine installed" has been logged, so it is said only once
+NO_ENGINE_LOGGED = threading.Event()
+
+# Fixed phrases synthesized ahead of time by PrewarmCache
+PREWARM_PHRASES = ["Goodbye!"] + FILLER_RESPONSES
+
+# Synthesized clips, keyed on text + voice + pitch + rate
+AUDIO_CACHE = None
+if str(env_vars.get("TTS_CACHE", "True")).lower() == "true":
+    AUDIO_CACHE = AudioCache(os.path.join(BASE_DIR, "Data", "AudioCache"),
+                             max_bytes=int(env_vars.get("TTS_CACHE_MB", 100)) * 1024 * 1024)
+
+# One mixer for the whole process, opened on first use (see AudioOutput)
+AUDIO_OUT = AudioOutput()
+
+# Play audio as edge_tts streams it instead of after the whole clip arrived
+STREAM_PLAYBACK = str(env_vars.get("TTS_STREAM", "True")).lower() == "true"
+
+# Only the first sentences of a long answer are spoken (see Speak)
+SPOKEN_SENTENCES = 2
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+STREAM_SYNTH_WORKERS = 3
+
+
+def IsLongAnswer(text) -> bool:
+    """Speak's rule for answers that get cut short with a filler"""
+    return len(text.split(".")) > 4 and len(text) >= 250
+
+
+class TextStream:
+    """Text produced on one thread and spoken on another; iterate to read deltas"""
+    _END = object()
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def put(self, text):
+        if text:
+            self._queue.put(text)
+
+    def close(self):
+        self._queue.put(self._END)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is self._END:
+                return
+            yield item
+
 
 class TextToSpeech:
     
     @staticmethod
-    async def TextToAudioFile(text) -> None:
-        file_path = os.path.join(BASE_DIR, "Data", "speech.mp3")
+    def Engine():
+        """TTS_ENGINE's pick for the next utterance, or None (logged once) when no engine is installed"""
+        backend = TTS_ENGINE.choose()
+        if backend is None and not NO_ENGINE_LOGGED.is_set():
+            NO_ENGINE_LOGGED.set()
+            print("[warning] TTS: no speech engine installed (edge-tts, piper-tts, pyttsx3 or espeak-ng), "
+                  "speech is skipped")
+        return backend
 
-        # Ensure Data folder exists
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    @staticmethod
+    def CacheKey(text, backend) -> str:
+        return AudioCache.key(text, backend.voice_key, VOICE_PITCH, VOICE_RATE)
 
-        if os.path.exists(file_path):
-            os.remove(file_path)
+    @staticmethod
+    def Cached(text, backend):
+        return AUDIO_CACHE.get(TextToSpeech.CacheKey(text, backend)) if AUDIO_CACHE is not None else None
 
-        # Pitch & Rate depending on gender
-        if AssistantGender == "Male":
-            pitch = "-2Hz"   
-            rate = "+2%"     
-        else:  # Female
-            pitch = "+4Hz"   
-            rate = "+5%" 
+    @staticmethod
+    def Render(text, backend, on_chunk=None) -> bytes:
+        """Synthesize with backend, or with a local engine if it fails before producing any audio.
+
+        Time to the first audio bytes is reported to TTS_ENGINE, and the clip
+        is cached under the voice that actually produced it.
+        """
+        started = time.perf_counter()
+        first = []
+
+        def _chunk(data):
+            if not first:
+                first.append(data)
+                TTS_ENGINE.record(backend, time.perf_counter() - started)
+            if on_chunk:
+                on_chunk(data)
+
+        try:
+            data = backend.stream(text, _chunk)
+        except Exception as e:
+            fallback = None if first else TTS_ENGINE.fallback(backend)
+            if fallback is None:
+                raise
+            print(f"[warning] TTS: {backend.name} failed ({e}), using {fallback.name}")
+            return TextToSpeech.Render(text, fallback, on_chunk)
+        if AUDIO_CACHE is not None:
+            AUDIO_CACHE.put(TextToSpeech.CacheKey(text, backend), data)
+        return data
 
-        communicate = edge_tts.Communicate(text, AssistantVoice, pitch=pitch, rate=rate)
-        await communicate.save(file_path)
+    @staticmethod
+    def Synthesize(text) -> bytes:
+        """Audio for text (mp3, or wav from a local engine), from the audio cache when it was synthesized before"""
+        backend = TextToSpeech.Engine()
+        if backend is None:
+            return b""
+        data = TextToSpeech.Cached(text, backend)
+        if data is None:
+            data = TextToSpeech.Render(text, backend)
+        return data
 
     @staticmethod
-    def TTS(Text, func=lambda r=None: True):
-        while True:
+    def SynthesizeStream(text, pool):
+        """Cached bytes for text, or an AudioStream fed from `pool` as the engine produces it.
+
+        The finished clip still goes into the audio cache, so a phrase is only
+        streamed the first time it is said. Engines that don't stream get a
+        Future instead.
+        """
+        backend = TextToSpeech.Engine()
+        if backend is None:
+            return b""
+        data = TextToSpeech.Cached(text, backend)
+        if data is not None:
+            return data
+        if not backend.streaming:
+            return pool.submit(TextToSpeech.Render, text, backend)
+
+        stream = AudioStream()
+
+        def _produce():
             try:
-                asyncio.run(TextToSpeech.TextToAudioFile(Text))
+                TextToSpeech.Render(text, backend, on_chunk=stream.put)
+            except Exception as e:
+                stream.close(e)
+                return
+            stream.close()
 
-                pygame.mixer.init()
-                file_path = os.path.join(BASE_DIR, "Data", "speech.mp3")
-                pygame.mixer.music.load(file_path)
-                pygame.mixer.music.play()
+        future = pool.submit(_produce)
+        # A producer dropped by pool.shutdown(cancel_futures=True) must still end its stream
+        future.add_done_callback(lambda f: f.cancelled() and stream.close())
+        return stream
 
-                clock = pygame.time.Clock()
-                while pygame.mixer.music.get_busy():
-                    if not func():
-                        break
-                    clock.tick(10)
+    @staticmethod
+    def Clip(text, pool):
+        """What to queue for text: an AudioStream, or a Future when streaming playback is off"""
+        if STREAM_PLAYBACK:
+            return TextToSpeech.SynthesizeStream(text, pool)
+        return pool.submit(TextToSpeech.Synthesize, text)
 
-                return True
-            except Exception as e:
-                print(f"Error in TTS : {e}")
+    @staticmethod
+    def PrewarmCache(phrases=None, background=True):
+        """Synthesize fixed phrases into the audio cache so they play instantly"""
+        if AUDIO_CACHE is None:
+            return
+
+        def _prewarm():
+            backend = TextToSpeech.Engine()
+            if backend is None:
+                return
+            missing = [phrase for phrase in (phrases or PREWARM_PHRASES)
+                       if TextToSpeech.CacheKey(phrase, backend) not in AUDIO_CACHE]
+            if not missing:
+                return
+            with ThreadPoolExecutor(max_workers=STREAM_SYNTH_WORKERS, thread_name_prefix="tts-prewarm") as pool:
+                for phrase, result in zip(missing, pool.map(TextToSpeech._try_synthesize, missing)):
+                    if result is None:
+                        print(f"[warning] Could not pre-synthesize '{phrase}'")
+            print(f"[info] Audio cache warmed with {len(missing)} phrase(s)")
+
+        if background:
+            threading.Thread(target=_prewarm, daemon=True, name="tts-prewarm").start()
+        else:
+            _prewarm()
+
+    @staticmethod
+    def _try_synthesize(text):
+        try:
+            return TextToSpeech.Synthesize(text)
+        except Exception:
+            return None
 
-            finally:
-                try:
-                    if pygame.mixer.get_init():
-                        func(False)
-                        pygame.mixer.music.stop()
-                        pygame.mixer.quit()
-                except Exception as e:
-                    print(f"Error in finally block: {e}")
+    @staticmethod
+    def PlayAudio(data, func=lambda r=None: True) -> bool:
+        """Play mp3 bytes; False if func() asked to stop or the speech was interrupted"""
+        return AUDIO_OUT.play(data, func)
+
+    @staticmethod
+    def TTS(Text, func=lambda r=None: True):
+        """Speak a text, or a list of texts one after another"""
+        if TextToSpeech.Engine() is None:
+            func(False)
+            return False
+        parts = [Text] if isinstance(Text, str) else [part for part in Text if part.strip()]
+        pool = ThreadPoolExecutor(max_workers=STREAM_SYNTH_WORKERS, thread_name_prefix="tts")
+        utterance = AUDIO_OUT.utterance(func)
+        try:
+            # Later parts synthesize (or load from the cache) while the first one plays
+            for part in parts:
+                utterance.add(TextToSpeech.Clip(part, pool))
+            utterance.close()
+            return utterance.wait()
+        except Exception as e:
+            print(f"Error in TTS : {e}")
+            return False
+        finally:
+            utterance.close()
+            pool.shutdown(wait=False, cancel_futures=True)
+            func(False)
+
+    @staticmethod
+    def Stop():
+        """Interrupt: cut off the current speech and drop anything queued to be said"""
+        AUDIO_OUT.interrupt()
+
+    @staticmethod
+    def Shutdown():
+        AUDIO_OUT.close()
 
     @staticmethod
     def DefaultMessage(func=lambda r=None: True):
@@ -92,39 +313,78 @@ class TextToSpeech:
 
     @staticmethod
     def Speak(Text, func=lambda r=None: True):
-        Data = str(Text).split(".")
-
-        responses = [
-            "The rest of the result has been printed to the chat screen, kindly check it out sir.",
-            "The rest of the text is now on the chat screen, sir, please check it.",
-            "You can see the rest of the text on the chat screen, sir.",
-            "The remaining part of the text is now on the chat screen, sir.",
-            "Sir, you'll find more text on the chat screen for you to see.",
-            "The rest of the answer is now on the chat screen, sir.",
-            "Sir, please look at the chat screen, the rest of the answer is there.",
-            "You'll find the complete answer on the chat screen, sir.",
-            "The next part of the text is on the chat screen, sir.",
-            "Sir, please check the chat screen for more information.",
-            "There's more text on the chat screen for you, sir.",
-            "Sir, take a look at the chat screen for additional text.",
-            "You'll find more to read on the chat screen, sir.",
-            "Sir, check the chat screen for the rest of the text.",
-            "The chat screen has the rest of the text, sir.",
-            "There's more to see on the chat screen, sir, please look.",
-            "Sir, the chat screen holds the continuation of the text.",
-            "You'll find the complete answer on the chat screen, kindly check it out sir.",
-            "Please review the chat screen for the rest of the text, sir.",
-            "Sir, look at the chat screen for the complete answer."
-        ]
-
-        if len(Data) > 4 and len(Text) >= 250:
-            TextToSpeech.TTS(" ".join(Text.split(".")[0:2]) + "." + random.choice(responses), func)
+        if IsLongAnswer(str(Text)):
+            # The filler is its own clip, so it plays from the audio cache
+            TextToSpeech.TTS([" ".join(Text.split(".")[0:2]) + ".", random.choice(FILLER_RESPONSES)], func)
         else:
             TextToSpeech.TTS(Text, func)
 
+    @staticmethod
+    def SpeakStream(chunks, func=lambda r=None: True, on_complete=None):
+        """Speak text while it is still being generated; returns the full text.
+
+        Each finished sentence is synthesized on a small pool as soon as it
+        arrives and played in order, so audio starts after the first sentence
+        rather than after the whole answer, and with streaming playback after
+        the first audio chunk of that sentence. Speak's rule still applies: the
+        first sentences are spoken, and sentences after them wait until it is
+        known whether the answer is long; a long answer ends with a filler.
+        `on_complete(text)` runs once the text is complete, typically before
+        playback has finished.
+        """
+        silent = TextToSpeech.Engine() is None
+        pool = ThreadPoolExecutor(max_workers=STREAM_SYNTH_WORKERS, thread_name_prefix="tts")
+        utterance = AUDIO_OUT.utterance(func)
+
+        def speak(sentence):
+            if sentence.strip() and utterance.active and not silent:
+                utterance.add(TextToSpeech.Clip(sentence, pool))
+
+        text = ""
+        pending = ""
+        spoken = 0
+        held = []        # sentences after the first ones, until the length rule decides
+        cut_short = False
+
+        try:
+            for delta in chunks:
+                text += delta
+                if cut_short:
+                    continue
+                *sentences, pending = SENTENCE_END.split(pending + delta)
+                for sentence in sentences:
+                    if spoken < SPOKEN_SENTENCES:
+                        speak(sentence)
+                        spoken += 1
+                    else:
+                        held.append(sentence)
+                if spoken >= SPOKEN_SENTENCES and IsLongAnswer(text):
+                    cut_short = True
+                    speak(random.choice(FILLER_RESPONSES))
+
+            if on_complete:
+                on_complete(text)
+
+            if not cut_short:
+                if IsLongAnswer(text):
+                    if spoken < SPOKEN_SENTENCES:
+                        speak(pending)
+                    speak(random.choice(FILLER_RESPONSES))
+                else:
+                    for sentence in held + [pending]:
+                        speak(sentence)
+        except Exception as e:
+            print(f"Error in TTS : {e}")
+        finally:
+            utterance.close()
+            utterance.wait()
+            pool.shutdown(wait=False, cancel_futures=True)
+            func(False)
+        return text
+
 
 if __name__ == "__main__":
-    print(f"[info] Running in {AssistantGender} mode (Voice: {AssistantVoice})")
+    print(f"[info] Running in {AssistantGender} mode (Voice: {AssistantVoice}, engine: {getattr(TextToSpeech.Engine(), 'name', 'none')})")
     TextToSpeech.DefaultMessage()
     while True:
         TextToSpeech.Speak(input("Enter the text : "))
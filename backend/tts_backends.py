@@ -0,0 +1,304 @@
+import io
+import os
+import time
+import wave
+import socket
+import shutil
+import asyncio
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+try:
+    import edge_tts
+except ImportError:
+    edge_tts = None
+
+try:
+    import pyttsx3
+except ImportError:
+    pyttsx3 = None
+
+try:
+    from piper.voice import PiperVoice
+except ImportError:
+    PiperVoice = None
+
+# Host edge_tts talks to; reachable means the online voice is usable
+EDGE_TTS_HOST = ("speech.platform.bing.com", 443)
+
+# Local engines in order of preference: neural first, then the system voices
+LOCAL_PREFERENCE = ["piper", "pyttsx3", "espeak"]
+
+
+class TTSBackend:
+    """One speech engine. synthesize() returns a whole clip (mp3 or wav bytes).
+
+    Engines that produce audio incrementally also override stream(), which
+    hands every chunk to `on_chunk` as it arrives and returns the whole clip.
+    `voice_key` identifies the voice in the audio cache key.
+    """
+    name = ""
+    local = True
+    streaming = False
+
+    def available(self) -> bool:
+        return False
+
+    @property
+    def voice_key(self) -> str:
+        return self.name
+
+    def synthesize(self, text: str) -> bytes:
+        raise NotImplementedError
+
+    def stream(self, text: str, on_chunk: Callable[[bytes], None]) -> bytes:
+        data = self.synthesize(text)
+        on_chunk(data)
+        return data
+
+
+class EdgeTTSBackend(TTSBackend):
+    """Microsoft's online neural voices; mp3 streamed over a websocket"""
+    name = "edge"
+    local = False
+    streaming = True
+
+    def __init__(self, voice: str, pitch: str = "+0Hz", rate: str = "+0%"):
+        self.voice = voice
+        self.pitch = pitch
+        self.rate = rate
+
+    def available(self) -> bool:
+        return edge_tts is not None
+
+    @property
+    def voice_key(self) -> str:
+        # Just the voice name, so clips cached before there were backends stay valid
+        return self.voice
+
+    async def _stream(self, text, on_chunk=None) -> bytes:
+        communicate = edge_tts.Communicate(text, self.voice, pitch=self.pitch, rate=self.rate)
+        audio = bytearray()
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                audio.extend(chunk["data"])
+                if on_chunk:
+                    on_chunk(chunk["data"])
+        return bytes(audio)
+
+    def synthesize(self, text: str) -> bytes:
+        return asyncio.run(self._stream(text))
+
+    def stream(self, text: str, on_chunk: Callable[[bytes], None]) -> bytes:
+        return asyncio.run(self._stream(text, on_chunk))
+
+
+class PiperBackend(TTSBackend):
+    """Piper neural voice running in-process from a local .onnx model"""
+    name = "piper"
+
+    def __init__(self, model_path: Optional[str]):
+        self.model_path = model_path
+        self._voice = None
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return PiperVoice is not None and bool(self.model_path) and os.path.exists(self.model_path)
+
+    @property
+    def voice_key(self) -> str:
+        return f"piper:{os.path.basename(self.model_path or '')}"
+
+    def _load(self):
+        with self._lock:
+            if self._voice is None:
+                self._voice = PiperVoice.load(self.model_path)
+            return self._voice
+
+    def synthesize(self, text: str) -> bytes:
+        voice = self._load()
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav_file:
+            # piper-tts 1.3 renamed synthesize() to synthesize_wav()
+            if hasattr(voice, "synthesize_wav"):
+                voice.synthesize_wav(text, wav_file)
+            else:
+                voice.synthesize(text, wav_file)
+        return buffer.getvalue()
+
+
+class Pyttsx3Backend(TTSBackend):
+    """The operating system's voices (SAPI5, NSSpeechSynthesizer, espeak) through pyttsx3.
+
+    pyttsx3 engines are tied to the thread that created them, so a single
+    worker thread owns the engine and every synthesis runs there.
+    """
+    name = "pyttsx3"
+
+    def __init__(self, gender: str = "Male", rate: Optional[int] = None):
+        self.gender = gender
+        self.rate = rate
+        self._engine = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyttsx3")
+
+    def available(self) -> bool:
+        return pyttsx3 is not None
+
+    @property
+    def voice_key(self) -> str:
+        return f"pyttsx3:{self.gender}:{self.rate}"
+
+    def _ensure_engine(self):
+        if self._engine is None:
+            engine = pyttsx3.init()
+            for voice in engine.getProperty("voices") or []:
+                # "male" is in "female", so compare the gender as a whole word
+                gender = str(getattr(voice, "gender", "") or "").lower()
+                if gender == self.gender.lower() or self.gender.lower() in str(voice.name).lower().split():
+                    engine.setProperty("voice", voice.id)
+                    break
+            if self.rate:
+                engine.setProperty("rate", self.rate)
+            self._engine = engine
+        return self._engine
+
+    def _synthesize(self, text: str) -> bytes:
+        engine = self._ensure_engine()
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def synthesize(self, text: str) -> bytes:
+        return self._executor.submit(self._synthesize, text).result()
+
+
+class EspeakBackend(TTSBackend):
+    """espeak-ng (or espeak) writing wav to stdout; robotic but always there on Linux"""
+    name = "espeak"
+
+    def __init__(self, voice: str = "en-gb", words_per_minute: int = 170, timeout: float = 10.0):
+        self.voice = voice
+        self.words_per_minute = words_per_minute
+        self.timeout = timeout
+
+    @property
+    def executable(self) -> Optional[str]:
+        return shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def available(self) -> bool:
+        return self.executable is not None
+
+    @property
+    def voice_key(self) -> str:
+        return f"espeak:{self.voice}:{self.words_per_minute}"
+
+    def synthesize(self, text: str) -> bytes:
+        result = subprocess.run([self.executable, "--stdout", "-v", self.voice, "-s", str(self.words_per_minute), text],
+                                capture_output=True, timeout=self.timeout, check=True)
+        return result.stdout
+
+
+class BackendSelector:
+    """Picks the engine for the next utterance.
+
+    `preferred` names a backend to always use while it is available; "auto"
+    uses the online voice while the network is reachable and its recent
+    time-to-first-audio is within `latency_budget` seconds, and a local
+    engine otherwise. Connectivity is probed with a short TCP connect to the
+    online service, and the answer is reused for `recheck` seconds. A failed
+    online synthesis counts as being offline until the next probe, and an
+    online voice that went over budget is given another try after the same
+    interval. choose() returns None when no engine is installed at all.
+    """
+
+    def __init__(self, backends: List[TTSBackend], preferred: str = "auto", latency_budget: float = 1.5,
+                 probe_address=EDGE_TTS_HOST, probe_timeout: float = 1.0, recheck: float = 60.0):
+        self.backends = {backend.name: backend for backend in backends}
+        self.preferred = preferred
+        self.latency_budget = latency_budget
+        self.probe_address = probe_address
+        self.probe_timeout = probe_timeout
+        self.recheck = recheck
+
+        self.latency = {}            # backend name -> smoothed time-to-first-audio (s)
+        self._measured_at = {}
+        self._online = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def online(self) -> bool:
+        with self._lock:
+            if self._online is not None and time.monotonic() - self._checked_at < self.recheck:
+                return self._online
+        try:
+            socket.create_connection(self.probe_address, timeout=self.probe_timeout).close()
+            online = True
+        except OSError:
+            online = False
+        with self._lock:
+            if online != self._online:
+                print(f"[info] TTS: {'online' if online else 'offline'}")
+            self._online = online
+            self._checked_at = time.monotonic()
+        return online
+
+    def record(self, backend: TTSBackend, seconds: float):
+        """Time from request to the first audio bytes of one synthesis"""
+        with self._lock:
+            previous = self.latency.get(backend.name)
+            self.latency[backend.name] = seconds if previous is None else 0.7 * previous + 0.3 * seconds
+            self._measured_at[backend.name] = time.monotonic()
+
+    def within_budget(self, backend: TTSBackend) -> bool:
+        with self._lock:
+            latency = self.latency.get(backend.name)
+            if latency is None or latency <= self.latency_budget:
+                return True
+            return time.monotonic() - self._measured_at[backend.name] >= self.recheck
+
+    def failed(self, backend: TTSBackend):
+        if not backend.local:
+            with self._lock:
+                self._online = False
+                self._checked_at = time.monotonic()
+
+    def local(self) -> Optional[TTSBackend]:
+        """The best local engine that is installed, if any"""
+        for name in LOCAL_PREFERENCE:
+            backend = self.backends.get(name)
+            if backend is not None and backend.available():
+                return backend
+        return None
+
+    def choose(self) -> Optional[TTSBackend]:
+        preferred = self.backends.get(self.preferred)
+        if preferred is not None and preferred.available():
+            return preferred
+
+        local = self.local()
+        for backend in self.backends.values():
+            if backend.local or not backend.available():
+                continue
+            if local is None:
+                return backend
+            if self.within_budget(backend) and self.online():
+                return backend
+        return local
+
+    def fallback(self, backend: TTSBackend) -> Optional[TTSBackend]:
+        """Engine to retry with after `backend` failed"""
+        self.failed(backend)
+        local = self.local()
+        return local if local is not backend else None
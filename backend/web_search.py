@@ -0,0 +1,547 @@
+import re
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urljoin, urlencode, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+try:
+    from selenium import webdriver
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+except ImportError:
+    webdriver = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BING_BASE_URL = "https://www.bing.com"
+DUCKDUCKGO_BASE_URL = "https://html.duckduckgo.com"
+WIKIPEDIA_BASE_URL = "https://en.wikipedia.org"
+
+# A result whose snippet is shorter than this doesn't count towards "enough"
+MIN_SNIPPET_CHARS = 40
+
+# How long search results stay fresh, by what the question is about (seconds)
+SEARCH_TTLS = {
+    "live": 5 * 60,           # prices, scores, weather
+    "news": 15 * 60,          # headlines, "today", "latest"
+    "factual": 6 * 3600,      # who is / what is lookups
+}
+
+SEARCH_CATEGORY_WORDS = {
+    "live": {"score", "scores", "live", "weather", "temperature", "price", "prices", "stock", "stocks",
+             "share", "shares", "nepse", "index", "market", "rate", "rates", "exchange", "bitcoin", "crypto"},
+    "news": {"news", "headline", "headlines", "today", "todays", "tonight", "latest", "breaking",
+             "recent", "recently", "current", "currently", "now", "update", "updates", "yesterday"},
+}
+
+# A desktop browser UA gets the same result markup Selenium used to scrape
+DEFAULT_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def search_category(normalized_query: str) -> str:
+    """'live', 'news' or 'factual' for a query already passed through normalize_query"""
+    words = set(normalized_query.split())
+    for category in ("live", "news"):
+        if words & SEARCH_CATEGORY_WORDS[category]:
+            return category
+    return "factual"
+
+
+def _css_class(name: str):
+    """SoupStrainer matcher for elements that carry `name` among their classes"""
+    return re.compile(rf"(^|\s){re.escape(name)}(\s|$)")
+
+
+def make_session(pool_size: int = 8) -> requests.Session:
+    """requests.Session with browser headers and a keep-alive pool"""
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class BingHttpSearch:
+    """Fetches Bing result pages over one pooled HTTP session.
+
+    A search is a single GET of /search?q=..., parsed for the same
+    `li.b_algo` blocks the Selenium scraper read, so no browser is started
+    and the TLS connection is reused between questions. `base_url` can point
+    at a local fixture server for testing.
+    """
+
+    def __init__(self, base_url: str = BING_BASE_URL, timeout: float = 5.0, market: str = "en-US",
+                 session: requests.Session = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.market = market
+        self.session = session or make_session()
+
+    def search(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
+        """Return up to num_results dicts {title, snippet, url}. Raises on HTTP errors."""
+        params = {"q": query, "setmkt": self.market, "count": max(10, num_results)}
+        response = self.session.get(f"{self.base_url}/search", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return self.parse_results(response.text, num_results, base_url=response.url)
+
+    @staticmethod
+    def parse_results(html: str, num_results: int = 5, base_url: str = "") -> List[Dict[str, str]]:
+        # Only build a tree for the result list, not the whole page
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer("li", class_=_css_class("b_algo")))
+        results = []
+        for item in soup.find_all("li", class_="b_algo"):
+            heading = item.find("h2")
+            link = heading.find("a", href=True) if heading else None
+            paragraph = item.select_one(".b_caption p") or item.find("p")
+            title = heading.get_text(" ", strip=True) if heading else ""
+            snippet = paragraph.get_text(" ", strip=True) if paragraph else ""
+            if not title and not snippet:
+                continue
+            results.append({
+                "title": title or "No title",
+                "snippet": snippet or "No snippet",
+                "url": urljoin(base_url, link["href"]) if link else "",
+            })
+            if len(results) >= num_results:
+                break
+        return results
+
+    def close(self):
+        self.session.close()
+
+
+class DuckDuckGoHttpSearch:
+    """Searches DuckDuckGo's no-JavaScript HTML endpoint (POST /html/)"""
+
+    def __init__(self, base_url: str = DUCKDUCKGO_BASE_URL, timeout: float = 5.0,
+                 session: requests.Session = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = session or make_session()
+
+    def search(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
+        response = self.session.post(f"{self.base_url}/html/", data={"q": query, "kl": "us-en"},
+                                     timeout=self.timeout)
+        response.raise_for_status()
+        return self.parse_results(response.text, num_results, base_url=response.url)
+
+    @staticmethod
+    def parse_results(html: str, num_results: int = 5, base_url: str = "") -> List[Dict[str, str]]:
+        soup = BeautifulSoup(html, HTML_PARSER, parse_only=SoupStrainer("div", class_=_css_class("result")))
+        results = []
+        for item in soup.select("div.result"):
+            if "result--ad" in item.get("class", []):
+                continue
+            link = item.select_one("a.result__a")
+            snippet = item.select_one(".result__snippet")
+            if link is None:
+                continue
+            url = urljoin(base_url, link.get("href", ""))
+            # Result links go through a /l/?uddg=<target> redirect
+            target = parse_qs(urlparse(url).query).get("uddg")
+            results.append({
+                "title": link.get_text(" ", strip=True) or "No title",
+                "snippet": snippet.get_text(" ", strip=True) if snippet else "No snippet",
+                "url": target[0] if target else url,
+            })
+            if len(results) >= num_results:
+                break
+        return results
+
+    def close(self):
+        self.session.close()
+
+
+class WikipediaSearch:
+    """Wikipedia full-text search returning the lead sentences of each article.
+
+    One API call: a search generator feeding the extracts prop, so every
+    result already carries plain-text intro sentences as its snippet.
+    """
+
+    def __init__(self, base_url: str = WIKIPEDIA_BASE_URL, timeout: float = 5.0, sentences: int = 3,
+                 session: requests.Session = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.sentences = sentences
+        self.session = session or make_session()
+
+    def search(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
+        params = {
+            "action": "query", "format": "json", "formatversion": 2,
+            "generator": "search", "gsrsearch": query, "gsrlimit": num_results,
+            "prop": "extracts|info", "inprop": "url",
+            "exintro": 1, "explaintext": 1, "exsentences": self.sentences, "exlimit": "max",
+        }
+        response = self.session.get(f"{self.base_url}/w/api.php", params=params, timeout=self.timeout)
+        response.raise_for_status()
+        pages = response.json().get("query", {}).get("pages", [])
+        pages.sort(key=lambda page: page.get("index", 0))
+        return [{
+            "title": page.get("title", "No title"),
+            "snippet": " ".join(page.get("extract", "").split()) or "No snippet",
+            "url": page.get("fullurl", f"{self.base_url}/wiki/{page.get('title', '').replace(' ', '_')}"),
+        } for page in pages[:num_results]]
+
+    def close(self):
+        self.session.close()
+
+
+def _url_key(url: str) -> str:
+    parsed = urlparse(url.lower())
+    host = parsed.netloc[4:] if parsed.netloc.startswith("www.") else parsed.netloc
+    return host + parsed.path.rstrip("/")
+
+
+def _text_key(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())[:80]
+
+
+def good_result(result: Dict[str, str]) -> bool:
+    return len(result.get("snippet", "")) >= MIN_SNIPPET_CHARS and result.get("snippet") != "No snippet"
+
+
+def merge_results(results_by_source: Dict[str, List[Dict[str, str]]], order: List[str]) -> List[Dict[str, str]]:
+    """Interleave sources by rank (1st of each, then 2nd of each, ...) and drop duplicates.
+
+    Two results are the same when their URLs match ignoring scheme, "www."
+    and a trailing slash, or when their titles or snippets start alike.
+    """
+    merged = []
+    seen = {}   # dedupe key -> index in merged
+    lists = [(name, results_by_source.get(name) or []) for name in order]
+    for rank in range(max((len(results) for _, results in lists), default=0)):
+        for name, results in lists:
+            if rank >= len(results):
+                continue
+            result = dict(results[rank], source=name)
+            keys = set()
+            if result["title"] != "No title":
+                keys.add("t:" + _text_key(result["title"]))
+            if result.get("url"):
+                keys.add(_url_key(result["url"]))
+            if good_result(result):
+                keys.add("s:" + _text_key(result["snippet"]))
+
+            duplicate = next((seen[key] for key in keys if key in seen), None)
+            if duplicate is not None:
+                # Keep the higher-ranked entry, but with the fuller snippet of the two
+                kept = merged[duplicate]
+                if len(result["snippet"]) > len(kept["snippet"]) and result["snippet"] != "No snippet":
+                    kept["snippet"] = result["snippet"]
+                continue
+            for key in keys:
+                seen[key] = len(merged)
+            merged.append(result)
+    return merged
+
+
+class MultiSourceSearch:
+    """Queries several search backends at once and keeps what arrives in time.
+
+    Every source runs on a shared thread pool. Results are merged and
+    deduplicated as each source finishes; waiting stops as soon as `enough`
+    good results (snippets of MIN_SNIPPET_CHARS or more) are in hand, or when
+    the latency `budget` runs out. Sources still running then are ignored,
+    so one slow backend no longer sets the latency of the whole question.
+    """
+
+    def __init__(self, sources: Dict[str, Callable[[str, int], List[Dict[str, str]]]],
+                 budget: float = 2.5, enough: Optional[int] = None):
+        self.sources = dict(sources)
+        self.budget = budget
+        self.enough = enough
+        self._executor = ThreadPoolExecutor(max_workers=max(2, 2 * len(self.sources)),
+                                            thread_name_prefix="search")
+
+    def search(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
+        started = time.perf_counter()
+        deadline = started + self.budget
+        enough = self.enough or num_results
+        order = list(self.sources)
+
+        pending = {self._executor.submit(search, query, num_results): name for name, search in self.sources.items()}
+        results_by_source = {}
+        merged = []
+        while pending:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    results_by_source[name] = future.result()
+                except Exception as e:
+                    print(f"[warning] {name} search failed: {e}")
+                    results_by_source[name] = []
+            merged = merge_results(results_by_source, order)
+            if sum(good_result(result) for result in merged) >= enough:
+                break
+
+        answered = ", ".join(f"{name} {len(results)}" for name, results in results_by_source.items()) or "none"
+        late = ", ".join(pending.values())
+        print(f"[info] Search fan-out: {len(merged)} merged result(s) in {time.perf_counter() - started:.2f}s "
+              f"({answered}{'; not waited for: ' + late if late else ''})")
+        # Prefer results with real snippets, keeping merge order otherwise
+        merged.sort(key=lambda result: not good_result(result))
+        return merged[:num_results]
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class BingBrowser:
+    """One headless Chrome kept warm across Bing searches.
+
+    Used when plain HTTP is not enough. The browser starts once (optionally
+    ahead of the first query via `warm_up`) and each search is a single
+    navigation to the results URL, waiting on the result list rather than
+    for fixed sleeps. Before every search the driver is health-checked and
+    restarted if it stopped responding, served `max_queries` searches, or
+    grew past `max_memory_mb` (Chrome and chromedriver combined).
+    """
+
+    def __init__(self, base_url: str = BING_BASE_URL, timeout: float = 10.0, market: str = "en-US",
+                 max_queries: int = 50, max_memory_mb: int = 800):
+        if webdriver is None:
+            raise RuntimeError("selenium is not installed")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.market = market
+        self.max_queries = max_queries
+        self.max_memory_mb = max_memory_mb
+
+        self.driver = None
+        self.queries = 0
+        self.restarts = 0
+        self._lock = threading.Lock()
+
+    # ---------- Lifecycle ----------
+
+    def _start(self):
+        options = Options()
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-notifications")
+        options.add_argument("--no-first-run")
+        options.add_argument("--no-default-browser-check")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--window-size=1280,900")
+        options.add_argument("--log-level=3")
+        options.add_argument(f"--user-agent={DEFAULT_HEADERS['User-Agent']}")
+        options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
+        # Return from get() at DOMContentLoaded; the wait below covers the results
+        options.page_load_strategy = "eager"
+
+        started = time.perf_counter()
+        self.driver = webdriver.Chrome(options=options)
+        self.driver.set_page_load_timeout(self.timeout)
+        self.queries = 0
+        print(f"[info] Headless Chrome started in {time.perf_counter() - started:.2f}s")
+
+    def _quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def _restart(self, reason: str):
+        print(f"[info] Restarting headless Chrome: {reason}")
+        self._quit()
+        self.restarts += 1
+        self._start()
+
+    def healthy(self) -> bool:
+        if self.driver is None:
+            return False
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def memory_mb(self) -> Optional[float]:
+        """Resident memory of chromedriver and every Chrome process under it"""
+        if psutil is None or self.driver is None:
+            return None
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+        except Exception:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+
+    def _ensure_driver(self):
+        if self.driver is None:
+            self._start()
+        elif not self.healthy():
+            self._restart("health check failed")
+        elif self.max_queries and self.queries >= self.max_queries:
+            self._restart(f"served {self.queries} queries")
+        else:
+            memory = self.memory_mb()
+            if memory is not None and self.max_memory_mb and memory > self.max_memory_mb:
+                self._restart(f"using {memory:.0f} MB")
+
+    def warm_up(self, background: bool = True):
+        """Start Chrome ahead of the first search"""
+        def _start():
+            try:
+                with self._lock:
+                    self._ensure_driver()
+            except Exception as e:
+                print(f"[warning] Headless Chrome warm-up failed: {e}")
+
+        if background:
+            threading.Thread(target=_start, daemon=True).start()
+        else:
+            _start()
+
+    def close(self):
+        with self._lock:
+            self._quit()
+
+    # ---------- Search ----------
+
+    def search(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
+        """Return up to num_results dicts {title, snippet, url}"""
+        with self._lock:
+            self._ensure_driver()
+            try:
+                return self._search(query, num_results)
+            except TimeoutException:
+                raise
+            except WebDriverException as e:
+                # Chrome crashed or the session died mid-query; one retry on a fresh browser
+                self._restart(f"driver error: {e.__class__.__name__}")
+                return self._search(query, num_results)
+
+    def _search(self, query: str, num_results: int) -> List[Dict[str, str]]:
+        self.queries += 1
+        url = f"{self.base_url}/search?" + urlencode({"q": query, "setmkt": self.market})
+        self.driver.get(url)
+        # Results, or Bing's "no results" block; either way the page is done
+        WebDriverWait(self.driver, self.timeout).until(
+            lambda d: d.find_elements(By.CSS_SELECTOR, "li.b_algo, li.b_no"))
+        # One page_source round trip instead of a driver call per element
+        return BingHttpSearch.parse_results(self.driver.page_source, num_results, base_url=self.driver.current_url)
+
+
+FIXTURE_PAGE = """<html><body><ol id="b_results">
+<li class="b_algo"><h2><a href="https://example.com/a">First <strong>result</strong></a></h2>
+  <div class="b_caption"><p>Snippet one.</p></div></li>
+<li class="b_ad"><h2><a href="https://ads.example.com">Sponsored</a></h2><p>Ad text</p></li>
+<li class="b_algo"><h2><a href="/relative">Second result</a></h2><p class="b_lineclamp2">Snippet two.</p></li>
+<li class="b_algo"><div class="b_caption"><p>Snippet without a title.</p></div></li>
+</ol></body></html>"""
+
+FIXTURE_DDG_PAGE = """<html><body><div class="results">
+<div class="result results_links result--ad"><a class="result__a" href="https://ads.example.com">Ad</a></div>
+<div class="result results_links"><h2><a class="result__a" href="/l/?uddg=https%3A%2F%2Fwww.example.com%2Fa%2F">First result</a></h2>
+  <a class="result__snippet">The same page Bing ranked first, reached through the redirect link.</a></div>
+<div class="result results_links"><h2><a class="result__a" href="/l/?uddg=https%3A%2F%2Fexample.org%2Fddg">Only on DuckDuckGo</a></h2>
+  <a class="result__snippet">A result with a long enough snippet to count as a good result.</a></div>
+</div></body></html>"""
+
+FIXTURE_WIKIPEDIA_JSON = {"query": {"pages": [
+    {"title": "Fixture (topic)", "index": 2, "extract": "A second article whose lead is long enough to count.",
+     "fullurl": "https://en.wikipedia.org/wiki/Fixture_(topic)"},
+    {"title": "Fixture", "index": 1, "extract": "Fixture is the first article and its intro sentences are the snippet.",
+     "fullurl": "https://en.wikipedia.org/wiki/Fixture"},
+]}}
+
+
+if __name__ == "__main__":
+    # Serve fixture pages for every source on localhost and search them: python web_search.py
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    slow_delay = 3.0
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def _reply(self):
+            if self.path.startswith("/slow"):
+                time.sleep(slow_delay)
+            if "/html/" in self.path:
+                body, kind = FIXTURE_DDG_PAGE.encode("utf-8"), "text/html"
+            elif "/w/api.php" in self.path:
+                body, kind = json.dumps(FIXTURE_WIKIPEDIA_JSON).encode("utf-8"), "application/json"
+            else:
+                body, kind = FIXTURE_PAGE.encode("utf-8"), "text/html"
+            self.send_response(200)
+            self.send_header("Content-Type", f"{kind}; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = _reply
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self._reply()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    local = f"http://127.0.0.1:{server.server_port}"
+
+    bing = BingHttpSearch(base_url=local)
+    for attempt in range(3):
+        started = time.perf_counter()
+        results = bing.search("fixture query", num_results=5)
+        print(f"bing #{attempt + 1}: {len(results)} result(s) in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    session = make_session()
+    fan_out = MultiSourceSearch({
+        "bing": BingHttpSearch(base_url=local, session=session).search,
+        "duckduckgo": DuckDuckGoHttpSearch(base_url=local, session=session).search,
+        "wikipedia": WikipediaSearch(base_url=local + "/slow", session=session).search,
+    }, budget=1.0)
+    print(f"\nfan-out with Wikipedia {slow_delay:.0f}s slow and a 1s budget:")
+    for result in fan_out.search("fixture query", num_results=5):
+        print(f"  [{result['source']}] {result['title']!r} | {result['snippet'][:50]!r} | {result['url']}")
+
+    fan_out.budget = slow_delay + 1
+    print("\nfan-out waiting for every source:")
+    for result in fan_out.search("fixture query", num_results=6):
+        print(f"  [{result['source']}] {result['title']!r} | {result['snippet'][:50]!r} | {result['url']}")
+
+    fan_out.close()
+    session.close()
+    bing.close()
+    server.shutdown()
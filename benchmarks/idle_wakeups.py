@@ -0,0 +1,94 @@
+"""Idle wakeups and pickup latency: sleep-polling vs blocking queue consumers.
+
+The old task_worker/response_handler loops checked queue.empty() and slept
+50 ms when there was nothing to do. The current ones block on queue.get().
+This script runs both styles side by side and reports how often each wakes
+up while idle and how long a newly queued item waits before pickup.
+
+    python benchmarks/idle_wakeups.py [--idle 5] [--consumers 6]
+"""
+import argparse
+import queue
+import threading
+import time
+
+STOP = object()
+
+
+def polling_consumer(q, counters, latencies, stop_event):
+    """The previous loop shape: check, then sleep 50 ms"""
+    while not stop_event.is_set():
+        counters["wakeups"] += 1
+        if not q.empty():
+            enqueued_at = q.get()
+            latencies.append(time.perf_counter() - enqueued_at)
+            q.task_done()
+        else:
+            time.sleep(0.05)
+
+
+def blocking_consumer(q, counters, latencies, stop_event):
+    """The current loop shape: block until an item or the stop sentinel arrives"""
+    while True:
+        item = q.get()
+        counters["wakeups"] += 1
+        if item is STOP:
+            q.task_done()
+            break
+        latencies.append(time.perf_counter() - item)
+        q.task_done()
+
+
+def run(consumer, idle_seconds, consumers, items):
+    q = queue.Queue()
+    counters = {"wakeups": 0}
+    latencies = []
+    stop_event = threading.Event()
+    threads = [
+        threading.Thread(target=consumer, args=(q, counters, latencies, stop_event), daemon=True)
+        for _ in range(consumers)
+    ]
+    for t in threads:
+        t.start()
+
+    # Idle phase: nothing queued
+    time.sleep(idle_seconds)
+    idle_wakeups = counters["wakeups"]
+
+    # Load phase: items arrive one at a time at a random point in the poll cycle
+    for i in range(items):
+        time.sleep(0.013 * (i % 7))
+        q.put(time.perf_counter())
+    q.join()
+
+    stop_event.set()
+    for _ in threads:
+        q.put(STOP)
+    for t in threads:
+        t.join(timeout=1)
+
+    latencies.sort()
+    return {
+        "idle_wakeups_per_s": idle_wakeups / idle_seconds,
+        "p50_pickup_ms": latencies[len(latencies) // 2] * 1000,
+        "max_pickup_ms": latencies[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--idle", type=float, default=5.0, help="idle seconds to measure")
+    parser.add_argument("--consumers", type=int, default=6, help="consumer threads (5 workers + response handler)")
+    parser.add_argument("--items", type=int, default=50, help="items to time for pickup latency")
+    args = parser.parse_args()
+
+    print(f"{args.consumers} consumers, {args.idle:.0f}s idle, {args.items} items\n")
+    print(f"{'consumer':<10} {'idle wakeups/s':>15} {'p50 pickup ms':>15} {'max pickup ms':>15}")
+    for name, consumer in (("polling", polling_consumer), ("blocking", blocking_consumer)):
+        result = run(consumer, args.idle, args.consumers, args.items)
+        print(f"{name:<10} {result['idle_wakeups_per_s']:>15.1f} "
+              f"{result['p50_pickup_ms']:>15.2f} {result['max_pickup_ms']:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
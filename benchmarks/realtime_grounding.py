@@ -0,0 +1,155 @@
+"""Realtime grounding: search snippets alone vs fetched pages reranked with BM25.
+
+realtime_query used to send the title and first <p> of every search result
+to Groq, unranked. PageGrounder fetches the result pages, splits their main
+text into passages and keeps the best BM25 matches within a token budget.
+This script serves a generated fixture corpus on localhost (one page per
+result, one of them deliberately slow) and reports, for each mode, how long
+the stage took, how many tokens of context it produced (and how many more
+than the snippets) and whether the sentence that actually answers the
+question made it in. The default budget of 0 gives the passages as many
+tokens as the snippets, like the module's default.
+
+    python benchmarks/realtime_grounding.py [--topics 8] [--budget 0] [--slow 3]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from context_builder import TokenCounter  # noqa: E402
+from page_grounding import PageGrounder  # noqa: E402
+
+TOPICS = [
+    ("mount everest", "How tall is Mount Everest", "Mount Everest stands 8,849 metres above sea level after the 2020 survey."),
+    ("nepse index", "What did the NEPSE index close at", "The NEPSE index closed at 2,741.35 points, up 18.2 points on the day."),
+    ("python release", "When was Python 3.13 released", "Python 3.13 was released on 7 October 2024 with an experimental JIT."),
+    ("kathmandu weather", "What is the weather in Kathmandu", "Kathmandu is forecast to reach 24 degrees with light rain in the evening."),
+    ("world cup final", "Who won the cricket world cup final", "Australia won the cricket world cup final by six wickets in Ahmedabad."),
+    ("bitcoin price", "What is the bitcoin price", "Bitcoin traded at 67,420 dollars, about two percent higher than yesterday."),
+    ("nobel physics", "Who won the Nobel prize in physics", "The Nobel prize in physics went to Hopfield and Hinton for neural networks."),
+    ("iphone launch", "When is the next iPhone launch", "Apple will hold the next iPhone launch event on 9 September in Cupertino."),
+    ("everest record", "Who holds the record for most Everest summits", "Kami Rita Sherpa holds the record with 30 summits of Mount Everest."),
+    ("rupee rate", "What is the dollar to rupee exchange rate", "The dollar to rupee exchange rate was 133.4 in the latest central bank listing."),
+]
+
+FILLER = ("history background overview article readers often people many years region official report "
+          "according sources experts said analysis details information page updated community local "
+          "international statement published series related coverage further story").split()
+
+PAGES_PER_TOPIC = 4
+
+
+def filler_paragraph(rng, topic_words, words=60):
+    # Mentions the topic now and then, like a real page about it would
+    text = [rng.choice(topic_words) if rng.random() < 0.05 else rng.choice(FILLER) for _ in range(words)]
+    return " ".join(text).capitalize() + "."
+
+
+def build_corpus(topics, seed=7):
+    """{path: html} plus, per topic, the search results a search engine would return"""
+    rng = random.Random(seed)
+    pages = {}
+    cases = []
+    for t, (name, question, answer) in enumerate(topics):
+        topic_words = name.split()
+        # The last page is the slow one; keep the answer off it
+        answer_page = rng.randrange(PAGES_PER_TOPIC - 1)
+        results = []
+        for p in range(PAGES_PER_TOPIC):
+            paragraphs = [filler_paragraph(rng, topic_words) for _ in range(rng.randint(8, 14))]
+            if p == answer_page:
+                paragraphs.insert(rng.randint(3, len(paragraphs)), answer)
+            body = "".join(f"<p>{paragraph}</p>" for paragraph in paragraphs)
+            path = f"/t{t}/p{p}"
+            pages[path] = (f"<html><head><script>var x = 1;</script></head><body>"
+                           f"<nav><a href='/'>Home</a> <a href='/news'>News</a> {name} menu links</nav>"
+                           f"<article><h1>{name.title()} page {p}</h1>{body}</article>"
+                           f"<footer>Copyright {name} site, all rights reserved, privacy policy.</footer></body></html>")
+            # Like Bing's snippet: the opening of the page, not the answer
+            results.append({"title": f"{name.title()} page {p}", "snippet": paragraphs[0][:160], "path": path})
+        cases.append((question, answer, results))
+    return pages, cases
+
+
+def serve(pages, slow_paths, slow_delay):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path in slow_paths:
+                time.sleep(slow_delay)
+            html = pages.get(self.path)
+            body = (html or "not found").encode("utf-8")
+            try:
+                self.send_response(200 if html else 404)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass   # the grounder gave up on this page, as intended
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def context_tokens(counter, results):
+    return sum(counter.count(f"Title: {r['title']}\nSnippet: {r['snippet']}\n\n") for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics", type=int, default=8, help=f"questions to run (max {len(TOPICS)})")
+    parser.add_argument("--budget", type=int, default=0, help="grounding token budget (0: same as the snippets)")
+    parser.add_argument("--slow", type=float, default=3.0, help="delay of one slow page per question (s)")
+    parser.add_argument("--timeout", type=float, default=1.0, help="per-page timeout (s)")
+    args = parser.parse_args()
+
+    pages, cases = build_corpus(TOPICS[:args.topics])
+    # One page per question never arrives in time
+    slow_paths = {results[-1]["path"] for _, _, results in cases}
+    server = serve(pages, slow_paths, args.slow)
+    base = f"http://127.0.0.1:{server.server_port}"
+    counter = TokenCounter()
+    grounder = PageGrounder(max_pages=PAGES_PER_TOPIC, page_timeout=args.timeout,
+                            token_budget=args.budget or None, counter=counter)
+
+    rows = {"snippets": [], "grounded": []}
+    for question, answer, results in cases:
+        results = [dict(r, url=base + r["path"]) for r in results]
+        rows["snippets"].append((0.0, context_tokens(counter, results),
+                                 any(answer in r["snippet"] for r in results)))
+
+        started = time.perf_counter()
+        grounded = grounder.ground(question, results)
+        elapsed = time.perf_counter() - started
+        rows["grounded"].append((elapsed, context_tokens(counter, grounded),
+                                 any(answer in r["snippet"] for r in grounded)))
+    grounder.close()
+    server.shutdown()
+
+    print(f"\n{len(cases)} questions, {PAGES_PER_TOPIC} results each (1 page {args.slow:.0f}s slow), "
+          f"page timeout {args.timeout:.1f}s, budget {f'{args.budget} tokens' if args.budget else 'as snippets'}, "
+          f"{'tiktoken' if counter.exact else 'estimated'} token counts\n")
+    print(f"{'mode':<10} {'avg stage ms':>13} {'max stage ms':>13} {'avg tokens':>11} {'+tokens':>8} "
+          f"{'answer found':>13}")
+    baseline = sum(v[1] for v in rows["snippets"]) / len(rows["snippets"])
+    for mode, values in rows.items():
+        times = [v[0] for v in values]
+        tokens = [v[1] for v in values]
+        found = sum(v[2] for v in values)
+        average = sum(tokens) / len(tokens)
+        print(f"{mode:<10} {sum(times) / len(times) * 1000:>13.0f} {max(times) * 1000:>13.0f} "
+              f"{average:>11.0f} {average - baseline:>+8.0f} {found:>8}/{len(values)}")
+
+
+if __name__ == "__main__":
+    main()
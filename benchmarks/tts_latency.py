@@ -0,0 +1,99 @@
+"""Time to first audio: the online edge_tts voice vs the local engines.
+
+Every spoken sentence used to be a round trip to edge_tts. Speech now goes
+through a BackendSelector that falls back to Piper, pyttsx3 or espeak when
+the service is unreachable or slow. This script synthesizes the same
+sentences with every installed engine and reports how long the first audio
+bytes took (what the listener waits for), how long the whole clip took and
+the real-time factor (synthesis time / audio length). The last line shows
+what "auto" would pick right now.
+
+    python benchmarks/tts_latency.py [--repeat 3] [--backends edge,piper,pyttsx3,espeak]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from audio_output import Mp3FrameSplitter  # noqa: E402
+from tts_backends import BackendSelector, EdgeTTSBackend, EspeakBackend, PiperBackend, Pyttsx3Backend  # noqa: E402
+
+SENTENCES = [
+    "Good morning, sir.",
+    "The current time is seven oh three in the morning.",
+    "Your next meeting is at nine with the project team, and traffic on your usual route is light.",
+    "All security systems are online and functioning normally, and no unusual activity was detected overnight.",
+]
+
+
+def audio_seconds(data: bytes) -> float:
+    if data[:4] == b"RIFF":
+        with wave.open(io.BytesIO(data)) as wav_file:
+            return wav_file.getnframes() / wav_file.getframerate()
+    splitter = Mp3FrameSplitter()
+    frames = len(splitter.feed(data))
+    return frames * splitter.samples_per_frame / splitter.sample_rate if frames else 0.0
+
+
+def measure(backend, text):
+    """(seconds to first audio bytes, seconds to the whole clip, seconds of audio)"""
+    started = time.perf_counter()
+    first = []
+    data = backend.stream(text, lambda chunk: first or first.append(time.perf_counter()))
+    total = time.perf_counter() - started
+    return first[0] - started, total, audio_seconds(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per sentence")
+    parser.add_argument("--backends", default="edge,piper,pyttsx3,espeak", help="comma-separated engines to try")
+    parser.add_argument("--piper-model", default=os.environ.get("PIPER_MODEL"), help="path to a Piper .onnx voice")
+    args = parser.parse_args()
+
+    backends = [
+        EdgeTTSBackend("en-GB-RyanNeural", pitch="-2Hz", rate="+2%"),
+        PiperBackend(args.piper_model),
+        Pyttsx3Backend("Male"),
+        EspeakBackend("en-gb"),
+    ]
+    wanted = args.backends.split(",")
+
+    print(f"\n{len(SENTENCES)} sentences x {args.repeat} runs\n")
+    print(f"{'engine':<9} {'avg first ms':>13} {'p95 first ms':>13} {'avg clip ms':>12} {'rtf':>6}  note")
+    for backend in backends:
+        if backend.name not in wanted:
+            continue
+        if not backend.available():
+            print(f"{backend.name:<9} {'-':>13} {'-':>13} {'-':>12} {'-':>6}  not installed")
+            continue
+        firsts, totals, audio = [], [], 0.0
+        try:
+            backend.synthesize("Warming up.")   # model load / connection setup
+            for _ in range(args.repeat):
+                for text in SENTENCES:
+                    first, total, seconds = measure(backend, text)
+                    firsts.append(first)
+                    totals.append(total)
+                    audio += seconds
+        except Exception as e:
+            print(f"{backend.name:<9} {'-':>13} {'-':>13} {'-':>12} {'-':>6}  failed: {e}")
+            continue
+        firsts.sort()
+        p95 = firsts[min(len(firsts) - 1, int(len(firsts) * 0.95))]
+        rtf = sum(totals) / audio if audio else 0.0
+        note = "streamed" if backend.streaming else "whole clip"
+        print(f"{backend.name:<9} {sum(firsts) / len(firsts) * 1000:>13.0f} {p95 * 1000:>13.0f} "
+              f"{sum(totals) / len(totals) * 1000:>12.0f} {rtf:>6.2f}  {note}")
+
+    selector = BackendSelector(backends)
+    chosen = selector.choose()
+    print(f"\nauto picks: {chosen.name if chosen else 'none (no engine installed)'} (online: {selector.online()})")
+
+
+if __name__ == "__main__":
+    main()
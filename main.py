@@ -12,10 +12,13 @@ from Backend import (
     youtube_module,
     instagram_module,
     facebook_module,
-    system_automation
+    system_automation,
+    task_router,
+    message_bus
 )
 import threading
 import queue
+from concurrent.futures import Future, ThreadPoolExecutor
 from time import sleep
 from typing import List, Dict
 import re
@@ -27,6 +30,9 @@ from dotenv import dotenv_values
 env_vars = dotenv_values(".env")
 Username = env_vars.get("Username", "User")
 Assistantname = env_vars.get("Assistantname", "OmnisAI")
+TaskWorkers = int(env_vars.get("TASK_WORKERS", 5))
+# "bus" when the GUI runs in this process, "files" for a detached GUI
+GuiIpc = env_vars.get("GUI_IPC", "bus").lower()
 
 # File paths
 current_dir = os.getcwd()
@@ -49,13 +55,24 @@ youtube_engine = youtube_module.YoutubeModule()
 instagram_engine = instagram_module.InstagramModule()
 facebook_engine = facebook_module.FacebookModule()
 system_automation_driver = system_automation.SystemAutomation()
+decision_model = model.get_model_module()
 
-# Task queue for concurrent execution
-task_queue = queue.Queue()
+# In-process link to the GUI; None means the Frontend/Files/*.data protocol
+gui_bus = message_bus.MessageBus() if GuiIpc != "files" else None
+
+# Dispatch table: leading verb emitted by FirstLayerDMM → handler
+task_routes = task_router.TaskRouter("tasks")
+
+# Worker pool for concurrent task execution (created in main)
+task_pool = None
 response_queue = queue.Queue()
-active_threads = []
+RESPONSE_STOP = object()  # sentinel that stops response_handler
 run = True
 
+# Utterances whose tasks have not all finished yet
+pending_batches = set()
+pending_batches_lock = threading.Lock()
+
 # CRITICAL: Flags for mic control
 is_speaking = threading.Event()
 is_speaking.clear()
@@ -65,10 +82,15 @@ tasks_processing.clear()
 
 # GUI Communication Functions
 def SetMicrophoneStatus(Command):
+    if gui_bus:
+        gui_bus.publish(message_bus.MIC, Command)
+        return
     with open(rf'{TempDirPath}\Mic.data', 'w', encoding='utf-8') as file:
         file.write(Command)
 
 def GetMicrophoneStatus():
+    if gui_bus:
+        return gui_bus.latest(message_bus.MIC, "False")
     try:
         with open(rf'{TempDirPath}\Mic.data', 'r', encoding='utf-8') as file:
             Status = file.read().strip()
@@ -77,10 +99,15 @@ def GetMicrophoneStatus():
         return "False"
 
 def SetAssistantStatus(Status):
+    if gui_bus:
+        gui_bus.publish(message_bus.STATUS, Status)
+        return
     with open(rf'{TempDirPath}\Status.data', 'w', encoding='utf-8') as file:
         file.write(Status)
 
 def GetAssistantStatus():
+    if gui_bus:
+        return gui_bus.latest(message_bus.STATUS)
     try:
         with open(rf'{TempDirPath}\Status.data', 'r', encoding='utf-8') as file:
             Status = file.read()
@@ -94,6 +121,8 @@ def ShowTextToScreen(Text):
 
 def GetQueryFromGUI():
     """Get query from text input in GUI"""
+    if gui_bus:
+        return gui_bus.get_query()
     try:
         with open(rf'{TempDirPath}\Query.data', 'r', encoding='utf-8') as file:
             query = file.read().strip()
@@ -106,21 +135,26 @@ def GetQueryFromGUI():
     except:
         return None
 
+def WaitForGUI(timeout: float):
+    """Idle until the GUI sends something (bus) or for `timeout` seconds (files)"""
+    if gui_bus:
+        gui_bus.wait(timeout)
+    else:
+        sleep(timeout)
+
 def AppendToChat(text):
     """Append new message to chat display"""
+    # Responses.data is an append-only transcript, one message per line;
+    # the GUI tails it from the byte offset it last read and pages history from it
+    line = " ".join(text.splitlines()).strip()
     try:
-        with open(rf'{TempDirPath}\Responses.data', 'r', encoding='utf-8') as file:
-            current = file.read()
-        
-        if current:
-            new_content = current + "\n" + text
-        else:
-            new_content = text
-        
-        with open(rf'{TempDirPath}\Responses.data', 'w', encoding='utf-8') as file:
-            file.write(new_content)
-    except:
-        ShowTextToScreen(text)
+        with open(rf'{TempDirPath}\Responses.data', 'ab') as file:
+            file.write((line + "\n").encode('utf-8'))
+    except Exception as e:
+        print(f"[ERROR] Chat transcript write failed: {e}")
+    if gui_bus:
+        # Tells the GUI to read the new line now instead of polling for it
+        gui_bus.publish(message_bus.CHAT, line)
 
 def InitializeFiles():
     """Initialize all required data files"""
@@ -138,6 +172,16 @@ def InitializeFiles():
                     f.write('Ready')
                 else:
                     f.write('')
+    
+    # Older transcripts end without a newline; terminate the last line once
+    # so the first append starts on its own line
+    responses_path = os.path.join(TempDirPath, 'Responses.data')
+    with open(responses_path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
 
 def clean_query(query: str) -> str:
     """Remove parentheses, extra spaces, and clean up query"""
@@ -162,18 +206,26 @@ class TaskCategory:
     YOUTUBE_SEARCH = "youtube search"
     CONTENT = "content"
     MEROLAGANI = "merolagani"
+    PLAY = "play"
+    SYSTEM = "system"
     EXIT = "exit"
 
+@task_routes.register(TaskCategory.GENERAL)
 def handle_general_query(query: str):
     """Handle general chatbot queries"""
+    # Queued before generation starts, so speech can begin with the first sentence
+    stream = text_to_speech.TextStream()
+    response_queue.put(("speak_stream", stream, "general"))
     try:
         query = clean_query(query)
-        response = Chatbot_engine.ask(query)
-        print(f"[GENERAL] {response}")
-        response_queue.put(("speak", response, "general"))
+        for delta in Chatbot_engine.ask_stream(query):
+            stream.put(delta)
     except Exception as e:
         print(f"[ERROR] General query failed: {e}")
+    finally:
+        stream.close()
 
+@task_routes.register(TaskCategory.REALTIME)
 def handle_realtime_query(query: str):
     """Handle realtime search queries"""
     try:
@@ -184,6 +236,7 @@ def handle_realtime_query(query: str):
     except Exception as e:
         print(f"[ERROR] Realtime query failed: {e}")
 
+@task_routes.register(TaskCategory.IMAGE_GEN)
 def handle_image_generation(query: str):
     """Handle image generation - non-blocking"""
     try:
@@ -194,6 +247,7 @@ def handle_image_generation(query: str):
     except Exception as e:
         print(f"[ERROR] Image generation failed: {e}")
 
+@task_routes.register(TaskCategory.GOOGLE_SEARCH)
 def handle_google_search(query: str):
     """Handle Google search"""
     try:
@@ -203,6 +257,7 @@ def handle_google_search(query: str):
     except Exception as e:
         print(f"[ERROR] Google search failed: {e}")
 
+@task_routes.register([TaskCategory.YOUTUBE_SEARCH, TaskCategory.PLAY])
 def handle_youtube_search(query: str):
     """Handle YouTube search"""
     try:
@@ -212,6 +267,7 @@ def handle_youtube_search(query: str):
     except Exception as e:
         print(f"[ERROR] YouTube search failed: {e}")
 
+@task_routes.register(TaskCategory.CONTENT)
 def handle_content_writing(query: str):
     """Handle content writing"""
     try:
@@ -221,6 +277,7 @@ def handle_content_writing(query: str):
     except Exception as e:
         print(f"[ERROR] Content writing failed: {e}")
 
+@task_routes.register(TaskCategory.MEROLAGANI)
 def handle_merolagani(query: str):
     """Handle Merolagani queries"""
     try:
@@ -252,30 +309,33 @@ def normalize_app_name(app_name: str) -> str:
     
     return app_mappings.get(app_name, app_name)
 
+# Sites that open in their own automation module instead of as system apps
+OPEN_SITE_ACTIONS = {
+    "instagram": (lambda: instagram_engine.instagram(), "Instagram"),
+    "facebook": (lambda: facebook_engine.facebook(), "Facebook"),
+    "merolagani": (lambda: merolagani_server.merolagani("TTL"), "Merolagani"),
+    "youtube": (lambda: youtube_engine.youtube("Trending"), "YouTube"),
+}
+
+@task_routes.register(TaskCategory.OPEN)
 def handle_open_command(query: str):
     """Handle open commands"""
     try:
         query = clean_query(query)
         normalized_name = normalize_app_name(query)
         
-        if "instagram" in query.lower():
-            instagram_engine.instagram()
-            print("[OPEN] ✅ Instagram")
-        elif "facebook" in query.lower():
-            facebook_engine.facebook()
-            print("[OPEN] ✅ Facebook")
-        elif "merolagani" in query.lower():
-            merolagani_server.merolagani("TTL")
-            print("[OPEN] ✅ Merolagani")
-        elif "youtube" in query.lower():
-            youtube_engine.youtube("Trending")
-            print("[OPEN] ✅ YouTube")
+        site = OPEN_SITE_ACTIONS.get(normalized_name.split(" ")[0]) if normalized_name else None
+        if site:
+            open_site, label = site
+            open_site()
+            print(f"[OPEN] ✅ {label}")
         else:
             system_automation_driver.open_app(normalized_name)
             print(f"[OPEN] ✅ {normalized_name}")
     except Exception as e:
         print(f"[ERROR] Open command failed: {e}")
 
+@task_routes.register(TaskCategory.CLOSE)
 def handle_close_command(query: str):
     """Handle close commands"""
     try:
@@ -286,6 +346,137 @@ def handle_close_command(query: str):
     except Exception as e:
         print(f"[ERROR] Close command failed: {e}")
 
+@task_routes.register(TaskCategory.EXIT)
+def handle_exit(_query: str = ""):
+    """Stop the main loop and say goodbye"""
+    global run
+    run = False
+    response_queue.put(("speak", "Goodbye!", "exit"))
+    if gui_bus:
+        gui_bus.wake()
+
+def app_action(action, message):
+    """Command table entry: call an automation method and log it"""
+    def handler(_argument: str = ""):
+        action()
+        print(message)
+    return handler
+
+def parse_amount(argument: str):
+    """Signed integer from a command argument like '50', '-30' or 'by 20'"""
+    match = re.search(r"-?\d+", argument)
+    return int(match.group()) if match else None
+
+# ---------- Per-app command tables ----------
+youtube_commands = task_router.TaskRouter("youtube")
+youtube_commands.register(["next video", "next"], app_action(lambda: youtube_engine.next_video(), "[YOUTUBE] ⏭️ Next video"))
+youtube_commands.register(["previous video", "prev video", "previous"], app_action(lambda: youtube_engine.previous_video(), "[YOUTUBE] ⏮️ Previous video"))
+youtube_commands.register(["play", "play video"], app_action(lambda: youtube_engine.play(), "[YOUTUBE] ▶️ Play"))
+youtube_commands.register(["pause", "pause video"], app_action(lambda: youtube_engine.pause(), "[YOUTUBE] ⏸️ Pause"))
+youtube_commands.register(["fullscreen", "full screen"], app_action(lambda: youtube_engine.fullscreen(), "[YOUTUBE] ⛶ Fullscreen"))
+youtube_commands.register(["mute", "unmute", "mute video", "unmute video"], app_action(lambda: youtube_engine.mute_unmute(), "[YOUTUBE] 🔇 Mute/Unmute"))
+youtube_commands.register("seek forward", app_action(lambda: youtube_engine.seek_forward(), "[YOUTUBE] ⏩ Seek forward"))
+youtube_commands.register("seek backward", app_action(lambda: youtube_engine.seek_backward(), "[YOUTUBE] ⏪ Seek backward"))
+
+merolagani_commands = task_router.TaskRouter("merolagani")
+merolagani_commands.register(["scroll up", "scroll feed up"], app_action(lambda: merolagani_server.scroll_up(), "[MEROLAGANI] ⬆️ Scrolling up"))
+merolagani_commands.register(["scroll down", "scroll feed down"], app_action(lambda: merolagani_server.scroll_down(), "[MEROLAGANI] ⬇️ Scrolling down"))
+merolagani_commands.register(["stop scroll", "stop scrolling"], app_action(lambda: merolagani_server.stop_scroll(), "[MEROLAGANI] ⏸️ Scroll stopped"))
+
+instagram_commands = task_router.TaskRouter("instagram")
+instagram_commands.register("scroll feed down", app_action(lambda: instagram_engine.scroll_feed_down(1), "[INSTAGRAM] ⬇️ Scroll feed down"))
+instagram_commands.register("scroll feed up", app_action(lambda: instagram_engine.scroll_feed_up(1), "[INSTAGRAM] ⬆️ Scroll feed up"))
+instagram_commands.register(["scroll down", "swipe down"], app_action(lambda: instagram_engine.scroll_down(), "[INSTAGRAM] ⬇️ Scroll down"))
+instagram_commands.register(["scroll up", "swipe up"], app_action(lambda: instagram_engine.scroll_up(), "[INSTAGRAM] ⬆️ Scroll up"))
+instagram_commands.register(["stop scroll", "stop scrolling"], app_action(lambda: instagram_engine.stop_scroll_feed(), "[INSTAGRAM] ⏸️ Scroll stopped"))
+instagram_commands.register(["play reels", "open reels"], app_action(lambda: instagram_engine.play_reels(), "[INSTAGRAM] 🎬 Playing reels"))
+instagram_commands.register(["mute", "unmute", "mute reels", "unmute reels"], app_action(lambda: instagram_engine.mute_unmute(), "[INSTAGRAM] 🔇 Mute/Unmute"))
+instagram_commands.register(["pause", "play"], app_action(lambda: instagram_engine.play_pause(), "[INSTAGRAM] ⏯️ Play/Pause"))
+instagram_commands.register(["next story", "swipe left"], app_action(lambda: instagram_engine.next_story(), "[INSTAGRAM] ⏭️ Next story"))
+instagram_commands.register(["previous story", "prev story", "swipe right"], app_action(lambda: instagram_engine.prev_story(), "[INSTAGRAM] ⏮️ Previous story"))
+instagram_commands.register(["open story", "show stories"], app_action(lambda: instagram_engine.open_story(), "[INSTAGRAM] 📖 Story opened"))
+instagram_commands.register("close story", app_action(lambda: instagram_engine.close_story(), "[INSTAGRAM] ❌ Story closed"))
+
+facebook_commands = task_router.TaskRouter("facebook")
+facebook_commands.register(["play video", "play videos", "open videos"], app_action(lambda: facebook_engine.play_videos(), "[FACEBOOK] ▶️ Playing video"))
+facebook_commands.register(["mute video", "unmute video", "mute", "unmute"], app_action(lambda: facebook_engine.mute_unmute_video(), "[FACEBOOK] 🔇 Mute/Unmute video"))
+facebook_commands.register(["pause video", "pause", "play"], app_action(lambda: facebook_engine.play_pause(), "[FACEBOOK] ⏸️ Pause"))
+facebook_commands.register(["show stories", "open story"], app_action(lambda: facebook_engine.open_story(), "[FACEBOOK] 📖 Stories opened"))
+facebook_commands.register(["next story", "swipe left"], app_action(lambda: facebook_engine.next_story(), "[FACEBOOK] ⏭️ Next story"))
+facebook_commands.register(["previous story", "prev story", "swipe right"], app_action(lambda: facebook_engine.prev_story(), "[FACEBOOK] ⏮️ Previous story"))
+facebook_commands.register("close story", app_action(lambda: facebook_engine.close_story(), "[FACEBOOK] ❌ Story closed"))
+facebook_commands.register(["home page", "go to home page", "go home"], app_action(lambda: facebook_engine.to_home_page(), "[FACEBOOK] 🏠 Home page"))
+facebook_commands.register(["scroll feed up", "scroll up"], app_action(lambda: facebook_engine.scroll_feed_up(1), "[FACEBOOK] ⬆️ Scroll feed up"))
+facebook_commands.register(["scroll feed down", "scroll down"], app_action(lambda: facebook_engine.scroll_feed_down(1), "[FACEBOOK] ⬇️ Scroll feed down"))
+facebook_commands.register(["stop scroll", "stop scrolling"], app_action(lambda: facebook_engine.stop_scroll_feed(), "[FACEBOOK] ⏸️ Scroll stopped"))
+
+system_commands = task_router.TaskRouter("system")
+system_commands.register(["mute", "mute volume", "mute system"], app_action(lambda: system_automation_driver.mute_system(), "[SYSTEM] 🔇 Muted"))
+system_commands.register(["unmute", "unmute volume", "unmute system"], app_action(lambda: system_automation_driver.unmute_system(), "[SYSTEM] 🔊 Unmuted"))
+system_commands.register(["show desktop", "minimize everything"], app_action(lambda: system_automation_driver.show_desktop(), "[SYSTEM] 🖥️ Desktop shown"))
+system_commands.register(["minimize active window", "minimize window", "minimize this", "minimize current window"],
+                         app_action(lambda: system_automation_driver.minimize_active_window(), "[SYSTEM] ⬇️ Window minimized"))
+system_commands.register(["take screenshot", "screenshot"], app_action(lambda: system_automation_driver.take_screenshot(), "[SYSTEM] 📸 Screenshot taken"))
+system_commands.register("volume up", app_action(lambda: system_automation_driver.change_volume_by(10), "[SYSTEM] 🔊 Volume +10%"))
+system_commands.register("volume down", app_action(lambda: system_automation_driver.change_volume_by(-10), "[SYSTEM] 🔉 Volume -10%"))
+system_commands.register("brightness up", app_action(lambda: system_automation_driver.change_brightness_by(10), "[SYSTEM] ☀️ Brightness +10%"))
+system_commands.register("brightness down", app_action(lambda: system_automation_driver.change_brightness_by(-10), "[SYSTEM] 🌙 Brightness -10%"))
+
+@system_commands.register(["switch apps", "switch app", "switch to"])
+def handle_switch_apps(app_name: str):
+    app_name = clean_query(app_name)
+    if not system_automation_driver.switch_apps(app_name):
+        normalized = normalize_app_name(app_name)
+        system_automation_driver.switch_apps(normalized)
+    print(f"[SYSTEM] ↔️ Switched to: {app_name}")
+
+@system_commands.register(["switch chrome tab", "switch tab"])
+def handle_switch_chrome_tab(tab_name: str):
+    tab_name = clean_query(tab_name)
+    system_automation_driver.switch_chrome_tab(tab_name)
+    print(f"[SYSTEM] 🗂️ Tab: {tab_name}")
+
+@system_commands.register(["set volume", "set volume to"])
+def handle_set_volume(argument: str):
+    volume = parse_amount(argument)
+    if volume is not None:
+        system_automation_driver.set_volume(volume)
+        print(f"[SYSTEM] 🔊 Volume: {volume}%")
+
+@system_commands.register(["change volume by", "change volume"])
+def handle_change_volume(argument: str):
+    delta = parse_amount(argument)
+    if delta is not None:
+        system_automation_driver.change_volume_by(delta)
+        print(f"[SYSTEM] 🔊 Volume {delta:+d}%")
+
+@system_commands.register(["set brightness", "set brightness to"])
+def handle_set_brightness(argument: str):
+    brightness = parse_amount(argument)
+    if brightness is not None:
+        system_automation_driver.set_brightness(brightness)
+        print(f"[SYSTEM] ☀️ Brightness: {brightness}%")
+
+@system_commands.register(["change brightness by", "change brightness"])
+def handle_change_brightness(argument: str):
+    delta = parse_amount(argument)
+    if delta is not None:
+        system_automation_driver.change_brightness_by(delta)
+        print(f"[SYSTEM] ☀️ Brightness {delta:+d}%")
+
+# Foreground app (lowercased, as reported by core_engine) → command table
+APP_COMMANDS = {
+    "youtube": youtube_commands,
+    "chrome - youtube": youtube_commands,
+    "merolagani": merolagani_commands,
+    "chrome - merolagani": merolagani_commands,
+    "instagram": instagram_commands,
+    "chrome - instagram": instagram_commands,
+    "facebook": facebook_commands,
+    "chrome - facebook": facebook_commands,
+}
+
+@task_routes.register(TaskCategory.AUTOMATION)
 def handle_automation(query: str):
     """Handle automation tasks based on foreground app"""
     try:
@@ -296,15 +487,9 @@ def handle_automation(query: str):
         
         print(f"[AUTOMATION] App: {foreground_App}, Command: {query}")
         
-        if foreground_App == "Youtube":
-            handle_youtube_automation(query)
-        elif foreground_App == "MeroLagani":
-            handle_merolagani_automation(query)
-        elif foreground_App == "Instagram":
-            handle_instagram_automation(query)
-        elif foreground_App == "Facebook":
-            handle_facebook_automation(query)
-        else:
+        commands = APP_COMMANDS.get((foreground_App or "").lower())
+        # App-specific commands first; anything they don't know is a system command
+        if commands is None or not commands.dispatch(query):
             handle_system_automation(query)
             
     except Exception as e:
@@ -315,276 +500,137 @@ def handle_automation(query: str):
         except:
             pass
 
-def handle_youtube_automation(query: str):
-    """YouTube-specific automation"""
-    if "next_video" in query or "next video" in query:
-        youtube_engine.next_video()
-        print("[YOUTUBE] ⏭️ Next video")
-    elif "previous_video" in query or "prev video" in query:
-        youtube_engine.previous_video()
-        print("[YOUTUBE] ⏮️ Previous video")
-    elif "play" in query:
-        youtube_engine.play()
-        print("[YOUTUBE] ▶️ Play")
-    elif "fullscreen" in query:
-        youtube_engine.fullscreen()
-        print("[YOUTUBE] ⛶ Fullscreen")
-    elif "mute" in query or "unmute" in query:
-        youtube_engine.mute_unmute()
-        print("[YOUTUBE] 🔇 Mute/Unmute")
-
-def handle_merolagani_automation(query: str):
-    """MeroLagani-specific automation"""
-    if "scroll" in query:
-        if "up" in query:
-            merolagani_server.scroll_up()
-            print("[MEROLAGANI] ⬆️ Scrolling up")
-        elif "stop" in query:
-            merolagani_server.stop_scroll()
-            print("[MEROLAGANI] ⏸️ Scroll stopped")
-        elif "down" in query:
-            merolagani_server.scroll_down()
-            print("[MEROLAGANI] ⬇️ Scrolling down")
-
-def handle_instagram_automation(query: str):
-    """Instagram-specific automation"""
-    if "scroll_feed_down" in query or "scroll feed down" in query:
-        instagram_engine.scroll_feed_down(1)
-        print("[INSTAGRAM] ⬇️ Scroll feed down")
-    elif "scroll_feed_up" in query or "scroll feed up" in query:
-        instagram_engine.scroll_feed_up(1)
-        print("[INSTAGRAM] ⬆️ Scroll feed up")
-    elif "scroll_down" in query:
-        instagram_engine.scroll_down()
-        print("[INSTAGRAM] ⬇️ Scroll down")
-    elif "scroll_up" in query:
-        instagram_engine.scroll_up()
-        print("[INSTAGRAM] ⬆️ Scroll up")
-    elif "stop_scroll" in query or "stop scroll" in query:
-        instagram_engine.stop_scroll_feed()
-        print("[INSTAGRAM] ⏸️ Scroll stopped")
-    elif "play_reels" in query or "play reels" in query:
-        instagram_engine.play_reels()
-        print("[INSTAGRAM] 🎬 Playing reels")
-    elif "mute" in query or "unmute" in query:
-        instagram_engine.mute_unmute()
-        print("[INSTAGRAM] 🔇 Mute/Unmute")
-    elif "pause" in query or "play" in query:
-        instagram_engine.play_pause()
-        print("[INSTAGRAM] ⏯️ Play/Pause")
-    elif "next_story" in query or "next story" in query:
-        instagram_engine.next_story()
-        print("[INSTAGRAM] ⏭️ Next story")
-    elif "prev_story" in query or "previous story" in query:
-        instagram_engine.prev_story()
-        print("[INSTAGRAM] ⏮️ Previous story")
-    elif "open_story" in query or "open story" in query:
-        instagram_engine.open_story()
-        print("[INSTAGRAM] 📖 Story opened")
-    elif "close_story" in query or "close story" in query:
-        instagram_engine.close_story()
-        print("[INSTAGRAM] ❌ Story closed")
-
-def handle_facebook_automation(query: str):
-    """Facebook-specific automation"""
-    if "play_video" in query or "play video" in query:
-        facebook_engine.play_videos()
-        print("[FACEBOOK] ▶️ Playing video")
-    elif "mute_video" in query or "unmute_video" in query:
-        facebook_engine.mute_unmute_video()
-        print("[FACEBOOK] 🔇 Mute/Unmute video")
-    elif "pause_video" in query or "pause video" in query:
-        facebook_engine.play_pause()
-        print("[FACEBOOK] ⏸️ Pause")
-    elif "show_stories" in query or "show stories" in query:
-        facebook_engine.open_story()
-        print("[FACEBOOK] 📖 Stories opened")
-    elif "next_story" in query or "next story" in query:
-        facebook_engine.next_story()
-        print("[FACEBOOK] ⏭️ Next story")
-    elif "prev_story" in query or "previous story" in query:
-        facebook_engine.prev_story()
-        print("[FACEBOOK] ⏮️ Previous story")
-    elif "close_story" in query or "close story" in query:
-        facebook_engine.close_story()
-        print("[FACEBOOK] ❌ Story closed")
-    elif "home_page" in query or "home page" in query:
-        facebook_engine.to_home_page()
-        print("[FACEBOOK] 🏠 Home page")
-    elif "scroll_feed_up" in query or "scroll feed up" in query:
-        facebook_engine.scroll_feed_up(1)
-        print("[FACEBOOK] ⬆️ Scroll feed up")
-    elif "scroll_feed_down" in query or "scroll feed down" in query:
-        facebook_engine.scroll_feed_down(1)
-        print("[FACEBOOK] ⬇️ Scroll feed down")
-    elif "stop_scroll" in query or "stop scroll" in query:
-        facebook_engine.stop_scroll_feed()
-        print("[FACEBOOK] ⏸️ Scroll stopped")
-
+@task_routes.register(TaskCategory.SYSTEM)
 def handle_system_automation(query: str):
     """System-level automation"""
-    if "mute" in query and "unmute" not in query:
-        system_automation_driver.mute_system()
-        print("[SYSTEM] 🔇 Muted")
-    elif "unmute" in query:
-        system_automation_driver.unmute_system()
-        print("[SYSTEM] 🔊 Unmuted")
-    elif "switch_apps" in query or "switch app" in query or "switch to" in query:
-        app_name = query.replace("switch_apps", "").replace("switch app", "").replace("switch to", "").strip()
-        app_name = clean_query(app_name)
-        
-        if not system_automation_driver.switch_apps(app_name):
-            normalized = normalize_app_name(app_name)
-            system_automation_driver.switch_apps(normalized)
-        print(f"[SYSTEM] ↔️ Switched to: {app_name}")
-    elif "switch_chrome_tab" in query or "switch tab" in query:
-        tab_name = query.replace("switch_chrome_tab", "").replace("switch tab", "").strip()
-        system_automation_driver.switch_chrome_tab(tab_name)
-        print(f"[SYSTEM] 🗂️ Tab: {tab_name}")
-    elif "show desktop" in query or "minimize_everything" in query or "minimize everything" in query:
-        system_automation_driver.show_desktop()
-        print("[SYSTEM] 🖥️ Desktop shown")
-    elif "minimize_active_window" in query or "minimize window" in query:
-        system_automation_driver.minimize_active_window()
-        print("[SYSTEM] ⬇️ Window minimized")
-    elif "screenshot" in query or "take screenshot" in query:
-        system_automation_driver.take_screenshot()
-        print("[SYSTEM] 📸 Screenshot taken")
-    elif "set_volume" in query or "set volume" in query:
-        volume = ''.join(filter(str.isdigit, query))
-        if volume:
-            system_automation_driver.set_volume(int(volume))
-            print(f"[SYSTEM] 🔊 Volume: {volume}%")
-    elif "change_volume_by" in query or "volume up" in query or "volume down" in query:
-        if "up" in query:
-            system_automation_driver.change_volume_by(10)
-            print("[SYSTEM] 🔊 Volume +10%")
-        elif "down" in query:
-            system_automation_driver.change_volume_by(-10)
-            print("[SYSTEM] 🔉 Volume -10%")
-    elif "set_brightness" in query or "set brightness" in query:
-        brightness = ''.join(filter(str.isdigit, query))
-        if brightness:
-            system_automation_driver.set_brightness(int(brightness))
-            print(f"[SYSTEM] ☀️ Brightness: {brightness}%")
-    elif "change_brightness_by" in query or "brightness up" in query or "brightness down" in query:
-        if "up" in query:
-            system_automation_driver.change_brightness_by(10)
-            print("[SYSTEM] ☀️ Brightness +10%")
-        elif "down" in query:
-            system_automation_driver.change_brightness_by(-10)
-            print("[SYSTEM] 🌙 Brightness -10%")
+    if not system_commands.dispatch(query):
+        print(f"[UNHANDLED] Automation command: {query}")
 
 def task_executor(task: str):
     """Execute individual tasks in separate threads"""
     try:
-        task_lower = task.lower()
-        
-        if "general" in task_lower:
-            query = task.replace("general", "", 1).strip()
-            handle_general_query(query)
-            
-        elif "generate image" in task_lower:
-            query = task.replace("generate image", "", 1).strip()
-            handle_image_generation(query)
-            
-        elif "realtime" in task_lower:
-            query = task.replace("realtime", "", 1).strip()
-            handle_realtime_query(query)
-            
-        elif "google search" in task_lower:
-            query = task.replace("google search", "", 1).strip()
-            handle_google_search(query)
-            
-        elif "youtube search" in task_lower:
-            query = task.replace("youtube search", "", 1).strip()
-            handle_youtube_search(query)
-            
-        elif "content" in task_lower:
-            query = task.replace("content", "", 1).strip()
-            handle_content_writing(query)
-            
-        elif "merolagani" in task_lower:
-            query = task.replace("merolagani", "", 1).strip()
-            handle_merolagani(query)
-            
-        elif "close" in task_lower:
-            query = task.replace("close", "", 1).strip()
-            handle_close_command(query)
-            
-        elif "open" in task_lower:
-            query = task.replace("open", "", 1).strip()
-            handle_open_command(query)
-            
-        elif "automation" in task_lower:
-            query = task.replace("automation", "", 1).strip()
-            handle_automation(query)
-            
-        elif "exit" in task_lower:
-            global run
-            run = False
-            response_queue.put(("speak", "Goodbye!", "exit"))
-            
-        else:
+        if not task_routes.dispatch(task.strip()):
             print(f"[UNHANDLED] {task}")
             
     except Exception as e:
         print(f"[ERROR] Task execution failed: {e}")
 
-def task_worker():
-    """Worker thread that processes tasks from queue"""
-    while run:
-        try:
-            if not task_queue.empty():
-                task = task_queue.get()
-                print(f"[WORKER] Processing: {task}")
-                task_executor(task)
-                task_queue.task_done()
-            else:
-                sleep(0.05)
-        except Exception as e:
-            print(f"[ERROR] Worker thread error: {e}")
-            sleep(0.5)
+class UtteranceBatch:
+    """Tracks the tasks of one utterance; `done` resolves once all of them finish"""
+    def __init__(self, text: str):
+        self.text = text
+        self.done = Future()
+        self._pending = 0
+        self._sealed = False
+        self._lock = threading.Lock()
+
+    def submit(self, pool: ThreadPoolExecutor, task: str):
+        with self._lock:
+            self._pending += 1
+        future = pool.submit(run_task, task)
+        future.add_done_callback(self._task_finished)
+        return future
+
+    def seal(self):
+        """No more tasks will be added"""
+        with self._lock:
+            self._sealed = True
+            finished = self._pending == 0
+        if finished:
+            self._finish()
+
+    def _task_finished(self, _future):
+        with self._lock:
+            self._pending -= 1
+            finished = self._sealed and self._pending == 0
+        if finished:
+            self._finish()
+
+    def _finish(self):
+        if not self.done.done():
+            self.done.set_result(self.text)
+
+def run_task(task: str):
+    """Run one task on a pool worker"""
+    print(f"[WORKER] Processing: {task}")
+    task_executor(task)
+
+def on_batch_done(batch: UtteranceBatch):
+    # Queued behind the batch's responses so 'Ready' is shown after they are spoken
+    response_queue.put(("done", batch, ""))
 
 def response_handler():
     """Handle responses and TTS only for general/realtime queries"""
-    while run:
+    while True:
+        # Blocks until there is work; no wakeups while idle
+        item = response_queue.get()
+        if item is RESPONSE_STOP:
+            response_queue.task_done()
+            break
+        
         try:
-            if not response_queue.empty():
-                item = response_queue.get()
-                
-                if len(item) == 3:
-                    action, message, task_type = item
-                else:
-                    action, message = item
-                    task_type = ""
+            if len(item) == 3:
+                action, message, task_type = item
+            else:
+                action, message = item
+                task_type = ""
+            
+            if action == "done":
+                with pending_batches_lock:
+                    pending_batches.discard(message)
+                    all_done = not pending_batches
+                if all_done:
+                    tasks_processing.clear()
+                    SetAssistantStatus("Ready")
+                    print("[TASKS] ✅ All tasks completed\n")
+            
+            elif action == "speak":
+                # Display on GUI first
+                AppendToChat(f"OmnisAI: {message}")
                 
-                if action == "speak":
-                    # Display on GUI first
-                    AppendToChat(f"OmnisAI: {message}")
+                if should_speak(task_type):
+                    is_speaking.set()
+                    SetAssistantStatus("Speaking...")
+                    print("[MIC] 🔇 Microphone MUTED (Speaking...)")
                     
-                    if should_speak(task_type):
-                        is_speaking.set()
-                        SetAssistantStatus("Speaking...")
-                        print("[MIC] 🔇 Microphone MUTED (Speaking...)")
-                        
-                        TTS.Speak(message)
-                        
-                        sleep(0.3)
-                        
-                        is_speaking.clear()
-                        SetAssistantStatus("Ready")
-                        print("[MIC] 🎤 Microphone ACTIVE (Listening...)")
-                    else:
-                        print(f"[NO SPEECH] Task type '{task_type}' - Silent mode")
+                    TTS.Speak(message)
                     
-                response_queue.task_done()
-            else:
-                sleep(0.05)
+                    sleep(0.3)
+                    
+                    is_speaking.clear()
+                    SetAssistantStatus("Ready")
+                    print("[MIC] 🎤 Microphone ACTIVE (Listening...)")
+                    
+                    # Reply delivered; compress older chat turns off the hot path
+                    Chatbot_engine.summarize_in_background()
+                else:
+                    print(f"[NO SPEECH] Task type '{task_type}' - Silent mode")
+            
+            elif action == "speak_stream":
+                # message is a TextStream still being filled by a worker
+                is_speaking.set()
+                SetAssistantStatus("Speaking...")
+                print("[MIC] 🔇 Microphone MUTED (Speaking...)")
+                
+                def show_answer(text):
+                    answer = Chatbot_engine.answer_modifier(text.strip())
+                    print(f"[GENERAL] {answer}")
+                    if answer:
+                        AppendToChat(f"OmnisAI: {answer}")
+                
+                TTS.SpeakStream(message, on_complete=show_answer)
+                
+                sleep(0.3)
+                
+                is_speaking.clear()
+                SetAssistantStatus("Ready")
+                print("[MIC] 🎤 Microphone ACTIVE (Listening...)")
+                Chatbot_engine.summarize_in_background()
         except Exception as e:
             print(f"[ERROR] Response handler error: {e}")
             is_speaking.clear()
-            sleep(0.5)
+        finally:
+            response_queue.task_done()
 
 def process_user_input(text: str):
     """Process user input and queue tasks concurrently"""
@@ -600,30 +646,19 @@ def process_user_input(text: str):
         tasks_processing.set()
         SetAssistantStatus("Thinking...")
         
-        list_of_tasks = model.ModelModule().FirstLayerDMM(text)
-        print(f"[TASKS] {list_of_tasks}\n")
-        
-        for task in list_of_tasks:
-            task_queue.put(task)
-            
-        num_workers = min(len(list_of_tasks), 5)
-        worker_threads = []
-        for _ in range(num_workers):
-            worker = threading.Thread(target=task_worker, daemon=True)
-            worker.start()
-            worker_threads.append(worker)
-            active_threads.append(worker)
+        batch = UtteranceBatch(text)
+        with pending_batches_lock:
+            pending_batches.add(batch)
+        batch.done.add_done_callback(lambda _: on_batch_done(batch))
         
-        # Wait for all tasks to complete in background thread
-        def wait_for_completion():
-            task_queue.join()
-            response_queue.join()
-            tasks_processing.clear()
-            SetAssistantStatus("Ready")
-            print("[TASKS] ✅ All tasks completed\n")
-        
-        completion_thread = threading.Thread(target=wait_for_completion, daemon=True)
-        completion_thread.start()
+        # Tasks are submitted as the model emits them, so the first one can
+        # start while the rest of a compound command is still generating
+        try:
+            for task in decision_model.FirstLayerDMMStream(text):
+                print(f"[TASK] {task}")
+                batch.submit(task_pool, task)
+        finally:
+            batch.seal()
             
     except Exception as e:
         print(f"[ERROR] Input processing failed: {e}")
@@ -638,8 +673,18 @@ def main():
     print("📌 Ready to listen...")
     print("💬 Say 'exit' to quit\n")
     
-    # Initialize files
+    # Responses.data is the chat transcript in both modes; the other
+    # files are only read by a detached GUI
     InitializeFiles()
+    if gui_bus:
+        SetAssistantStatus("Ready")
+    sound_manager.status_callback = SetAssistantStatus
+    # "Goodbye!" and the long-answer fillers play from disk instead of the network
+    TTS.PrewarmCache()
+    
+    # Fixed-size worker pool, reused for every utterance
+    global task_pool
+    task_pool = ThreadPoolExecutor(max_workers=TaskWorkers, thread_name_prefix="task")
     
     # Start response handler thread
     response_thread = threading.Thread(target=response_handler, daemon=True)
@@ -651,19 +696,23 @@ def main():
             gui_query = GetQueryFromGUI()
             if gui_query:
                 print(f"[GUI INPUT] {gui_query}")
+                if is_speaking.is_set():
+                    # A typed query cuts off the answer still being read out
+                    TTS.Stop()
                 process_user_input(gui_query)
                 sleep(0.1)
                 continue
             
             # CRITICAL: Only listen if NOT speaking AND no tasks are processing
             if is_speaking.is_set() or tasks_processing.is_set():
-                sleep(0.1)
+                WaitForGUI(0.1)
                 continue
             
             # Check microphone status from GUI
             mic_status = GetMicrophoneStatus()
             if mic_status.lower() != "true":
-                sleep(0.1)
+                # A typed query or the mic button wakes this immediately
+                WaitForGUI(1.0 if gui_bus else 0.1)
                 continue
             
             # Listen for voice input
@@ -695,6 +744,13 @@ def main():
             SetAssistantStatus("Error occurred")
             sleep(1)
     
+    # Let running tasks finish, drop the ones that never started
+    task_pool.shutdown(wait=True, cancel_futures=True)
+    
+    # Speak whatever is still queued (e.g. "Goodbye!"), then stop the handler
+    response_queue.put(RESPONSE_STOP)
+    response_thread.join(timeout=15)
+    
     print("\n" + "="*60)
     print("✅ OMNISAI VOICE ASSISTANT STOPPED")
     print("="*60)
@@ -705,7 +761,7 @@ if __name__ == "__main__":
         from Frontend.GUI import GraphicalUserInterface
         
         # Start GUI in separate thread
-        gui_thread = threading.Thread(target=GraphicalUserInterface, daemon=False)
+        gui_thread = threading.Thread(target=GraphicalUserInterface, args=(gui_bus,), daemon=False)
         gui_thread.start()
         
         # Small delay to let GUI initialize
@@ -720,6 +776,8 @@ if __name__ == "__main__":
         run = False
         is_speaking.clear()
         tasks_processing.clear()
+        Realtime_Search_engine.close()
+        TTS.Shutdown()
         print("[CLEANUP] Complete")
 
 